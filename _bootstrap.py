@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
 
-REPO_ROOT = Path(__file__).resolve().parent
+# abspath instead of Path.resolve(): no per-component lstat/readlink at import
+_REPO_ROOT_STR = os.path.dirname(os.path.abspath(__file__))
+_SRC_DIR_STR = os.path.join(_REPO_ROOT_STR, "src")
+REPO_ROOT = Path(_REPO_ROOT_STR)
 DATA_DIR = REPO_ROOT / "data"
 RAW_DB_PATH = DATA_DIR / "data.sqlite"
 PROCESSED_DB_PATH = DATA_DIR / "data_processed.sqlite"
@@ -18,12 +22,9 @@ def add_src_to_sys_path() -> Path:
     `import qs` / `import data_fetcher` to work.
     """
 
-    src_dir = REPO_ROOT / "src"
-    if src_dir.is_dir():
-        src_str = str(src_dir)
-        if src_str not in sys.path:
-            sys.path.insert(0, src_str)
-    return src_dir
+    if _SRC_DIR_STR not in sys.path and os.path.isdir(_SRC_DIR_STR):
+        sys.path.insert(0, _SRC_DIR_STR)
+    return Path(_SRC_DIR_STR)
 
 
 add_src_to_sys_path()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import os
 import sys
 from pathlib import Path
 
+# abspath instead of Path.resolve(): no per-component lstat/readlink at import
+_SRC_DIR_STR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
 
 def add_src_to_sys_path() -> Path:
     """Ensure the repo's `src/` is importable when running scripts directly.
@@ -12,13 +16,9 @@ def add_src_to_sys_path() -> Path:
     imports like `import qs` / `import data_fetcher` work without installing.
     """
 
-    repo_root = Path(__file__).resolve().parents[1]
-    src_dir = repo_root / "src"
-    if src_dir.is_dir():
-        src_str = str(src_dir)
-        if src_str not in sys.path:
-            sys.path.insert(0, src_str)
-    return src_dir
+    if _SRC_DIR_STR not in sys.path and os.path.isdir(_SRC_DIR_STR):
+        sys.path.insert(0, _SRC_DIR_STR)
+    return Path(_SRC_DIR_STR)
 
 
 add_src_to_sys_path()
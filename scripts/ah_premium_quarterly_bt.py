@@ -3,8 +3,9 @@ from __future__ import annotations
 """Run quarterly A/H premium strategy backtest from 2018-01-01 to latest.
 
 Steps:
- 1. Build a calendar feed (use A-share benchmark index 000300.SH or simply distinct trade dates from daily_a).
- 2. Instantiate broker & strategy.
+ 1. Build a calendar feed (distinct A+H trade dates, materialized in trade_calendar).
+ 2. Instantiate broker & strategy, plus SqliteMarketData for the engine
+    (on_bar_ctx strategies read prices/FX through ctx.history and fail without it).
  3. Run engine, compute stats.
 
 Assumptions:
@@ -12,45 +13,109 @@ Assumptions:
 
 CLI:
   python scripts/ah_premium_quarterly_bt.py --start 20180101 --top 5 --bottom 5 --cash 1000000
+  python scripts/ah_premium_quarterly_bt.py --fast   # vectorized, frictionless approximation
 """
 import _bootstrap  # noqa: F401
 
 import argparse
-from qs.sqlite_utils import connect_sqlite
-from qs.backtester.data import Bar, DataFeed
-from qs.backtester.broker import Broker
-from qs.backtester.engine import BacktestEngine
-from qs.backtester.stats import (
-    compute_annual_returns,
-    compute_max_drawdown,
-    compute_risk_metrics,
-)
-from qs.strategy.ah_premium_quarterly import AHPremiumQuarterlyStrategy
-
-
-def load_calendar(start_date: str, db_path: str = "data/data.sqlite"):
-    con = connect_sqlite(db_path, read_only=True)
-    # Use union of A and H trading days to approximate combined calendar
-    q = f"""
-    SELECT trade_date,
-           MIN(open) AS open,
-           MIN(high) AS high,
-           MIN(low) AS low,
-           MIN(close) AS close,
-           NULL AS pct_chg
-    FROM (
-      SELECT trade_date, open, high, low, close FROM daily_a
-      UNION ALL
-      SELECT trade_date, open, high, low, close FROM daily_h
+
+DB_PATH = "data/data.sqlite"
+
+
+def load_calendar(start_date: str, db_path: str = DB_PATH):
+    from qs.backtester.data import DataFeed
+    from qs.backtester.runner import load_calendar_bars_from_sqlite
+
+    # Union of A and H trading days, served from the materialized trade_calendar
+    return DataFeed(load_calendar_bars_from_sqlite(db_path=db_path, start_date=start_date))
+
+
+def _hk_to_cny_rates(db_path: str, trade_dates: list[str]):
+    """HKD->CNY per calendar date (USDCNH/USDHKD mids), carried forward like get_hk_to_cny_rate."""
+    import numpy as np
+    import pandas as pd
+
+    from qs.sqlite_utils import read_sql_df_columnar
+
+    fx = read_sql_df_columnar(
+        db_path,
+        """
+        SELECT trade_date, ts_code, (bid_close + ask_close) / 2 AS mid
+        FROM fx_daily
+        WHERE ts_code IN ('USDCNH.FXCM', 'USDHKD.FXCM') AND trade_date <= ?
+        """,
+        [trade_dates[-1]],
     )
-    WHERE trade_date >= '{start_date}'
-    GROUP BY 1
-    ORDER BY 1
+    if fx.empty:
+        return np.full(len(trade_dates), np.nan)
+    mids = fx.pivot_table(index="trade_date", columns="ts_code", values="mid").dropna()
+    if mids.empty or len(mids.columns) < 2:
+        return np.full(len(trade_dates), np.nan)
+    rate = (mids["USDCNH.FXCM"] / mids["USDHKD.FXCM"]).sort_index()
+    idx = rate.index.union(trade_dates)
+    return rate.reindex(idx).ffill().reindex(trade_dates).to_numpy(dtype=float)
+
+
+def run_fast(args, db_path: str = DB_PATH):
+    """Frictionless vectorized run: same premium ranking, no fees/lots/slippage.
+
+    Signals come from the strategy itself (one premium query per rebalance);
+    positions are entered at the rebalance day's adjusted close and marked with
+    adjusted closes, so results approximate the event engine for fast iteration.
     """
-    rows = con.execute(q).fetchall()
-    con.close()
-    bars = [Bar(*r) for r in rows]
-    return DataFeed(bars)
+    import numpy as np
+
+    from qs.backtester.engine import EquityPoint
+    from qs.backtester.market import SqliteMarketData
+    from qs.backtester.runner import load_calendar_bars_from_sqlite
+    from qs.backtester.vectorized import load_close_matrix, run_signals
+    from qs.strategy.ah_premium_quarterly import AHPremiumQuarterlyStrategy
+
+    dates = [b.trade_date for b in load_calendar_bars_from_sqlite(db_path=db_path, start_date=args.start)]
+    if not dates:
+        return []
+    strat = AHPremiumQuarterlyStrategy(
+        db_path_raw=db_path,
+        top_k=args.top,
+        bottom_k=args.bottom,
+        start_date=args.start,
+        capital_split=args.capital_split,
+    )
+    md = SqliteMarketData(db_path)
+    try:
+        rebalances: list[tuple[int, dict[str, float]]] = []
+        for i in range(1, len(dates)):
+            trade_date, signal_date = dates[i], dates[i - 1]
+            if not strat.is_rebalance_day(trade_date, signal_date):
+                continue
+            targets = strat.target_weights(*strat.rank_premiums(md.history(signal_date), signal_date))
+            if targets:
+                rebalances.append((i, targets))
+                strat.mark_rebalanced(trade_date)
+    finally:
+        md.close()
+
+    a_syms = sorted({s for _, t in rebalances for s in t if not s.endswith(".HK")})
+    h_syms = sorted({s for _, t in rebalances for s in t if s.endswith(".HK")})
+    symbols = a_syms + h_syms
+    a_px = load_close_matrix(
+        db_path, table="daily_a", adjustment_table="adj_factor_a", symbols=a_syms, trade_dates=dates
+    )
+    h_px = load_close_matrix(
+        db_path, table="daily_h", adjustment_table="adj_factor_h", symbols=h_syms, trade_dates=dates
+    )
+    h_px *= _hk_to_cny_rates(db_path, dates)[:, None]
+    prices = np.hstack([a_px, h_px])
+
+    col_of = {s: j for j, s in enumerate(symbols)}
+    weights = np.full(prices.shape, np.nan)
+    for i, targets in rebalances:
+        weights[i] = 0.0
+        for sym, w in targets.items():
+            weights[i, col_of[sym]] = w
+
+    equity = run_signals(prices, weights, args.cash)
+    return [EquityPoint(d, float(e)) for d, e in zip(dates, equity)]
 
 
 def main():
@@ -69,18 +134,44 @@ def main():
         default=0.5,
         help="Fraction of capital to allocate to H leg cohort (0-1)",
     )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Vectorized frictionless equity curve (no fees/lots; close-to-close)",
+    )
     args = parser.parse_args()
 
-    feed = load_calendar(args.start)
-    broker = Broker(cash=args.cash, enable_trade_log=False)
-    strat = AHPremiumQuarterlyStrategy(
-        top_k=args.top,
-        bottom_k=args.bottom,
-        start_date=args.start,
-        capital_split=args.capital_split,
+    # Heavy imports after arg parsing so --help / usage errors return immediately
+    from qs.backtester.stats import (
+        compute_annual_returns,
+        compute_max_drawdown,
+        compute_risk_metrics,
     )
-    engine = BacktestEngine(feed, broker, strat)
-    curve = engine.run()
+
+    db_path = DB_PATH
+    if args.fast:
+        curve = run_fast(args, db_path)
+    else:
+        from qs.backtester.broker import Broker
+        from qs.backtester.engine import BacktestEngine
+        from qs.backtester.market import SqliteMarketData
+        from qs.strategy.ah_premium_quarterly import AHPremiumQuarterlyStrategy
+
+        feed = load_calendar(args.start, db_path)
+        broker = Broker(cash=args.cash, enable_trade_log=False)
+        strat = AHPremiumQuarterlyStrategy(
+            db_path_raw=db_path,
+            top_k=args.top,
+            bottom_k=args.bottom,
+            start_date=args.start,
+            capital_split=args.capital_split,
+        )
+        market_data = SqliteMarketData(db_path)
+        try:
+            engine = BacktestEngine(feed, broker, strat, market_data=market_data)
+            curve = engine.run()
+        finally:
+            market_data.close()
 
     ann = compute_annual_returns(curve)
     max_dd, dd_peak, dd_trough = compute_max_drawdown(curve)
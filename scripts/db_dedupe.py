@@ -6,7 +6,12 @@ from pathlib import Path
 
 import _bootstrap  # noqa: F401
 
-from qs.sqlite_utils import connect_sqlite, dedupe_table, ensure_unique_index_with_dedupe, table_exists
+from qs.sqlite_utils import (
+    connect_sqlite,
+    dedupe_table,
+    ensure_unique_index_with_dedupe,
+    refresh_trade_calendar,
+)
 
 
 UNIQUE_KEYS: dict[str, list[str]] = {
@@ -24,35 +29,40 @@ UNIQUE_KEYS: dict[str, list[str]] = {
 }
 
 
-def _has_invalid_key_rows(con, table: str, key_cols: list[str]) -> bool:
-    where = " OR ".join([f'"{c}" IS NULL OR "{c}" = \'\'' for c in key_cols])
-    row = con.execute(f'SELECT 1 FROM "{table}" WHERE {where} LIMIT 1').fetchone()
-    return row is not None
-
-
 def repair(db_path: Path, *, force_scan: bool) -> None:
     con = connect_sqlite(db_path)
     try:
+        existing = {
+            row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        }
         for table, key_cols in UNIQUE_KEYS.items():
-            if not table_exists(con, table):
+            if table not in existing:
                 continue
 
             deleted = 0
             if force_scan:
                 deleted = dedupe_table(con, table=table, key_columns=key_cols, delete_null_keys=True)
 
+            # Null/empty keys are always deleted before the index is ensured (already
+            # done by the force scan), so no separate invalid-key check is needed.
             ensure_unique_index_with_dedupe(
-                con, table=table, columns=key_cols, index_name=f"{table}_uq", delete_null_keys=True
+                con,
+                table=table,
+                columns=key_cols,
+                index_name=f"{table}_uq",
+                delete_null_keys=not force_scan,
             )
             con.commit()
 
-            invalid = _has_invalid_key_rows(con, table, key_cols)
             if deleted:
                 print(f"{table}: deleted={deleted} (force_scan)")
-            elif invalid:
-                print(f"{table}: has null/empty key rows (run with --force-scan to delete)")
             else:
                 print(f"{table}: ok")
+
+        # Dedupe may delete source rows; rebuild the derived calendar from scratch.
+        days = refresh_trade_calendar(con, rebuild=True)
+        con.commit()
+        print(f"trade_calendar: rebuilt ({days} dates)")
     finally:
         con.close()
 
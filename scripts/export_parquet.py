@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""导出日频表为按 ts_code 分区的 Parquet 目录, 供反复读取的研究/回测使用.
+
+回测脚本每次都从 SQLite 逐行读出同一批 A/H 日线, 这一步往往是瓶颈。
+这里借助 DuckDB (可选依赖) 挂载 SQLite 文件, 一次性写出 ZSTD 压缩的列式文件:
+
+    data/parquet/daily_a/ts_code=000001.SZ/data_0.parquet
+
+读取示例 (只扫描单个分区 + 所需列):
+
+    duckdb.sql(
+        "SELECT trade_date, open, high, low, close FROM read_parquet("
+        "'data/parquet/daily_a/*/*.parquet', hive_partitioning=true) "
+        "WHERE ts_code='000001.SZ' AND trade_date >= '20180101' ORDER BY trade_date"
+    ).df()
+
+Parquet 只是 SQLite 的快照, 日频同步后需重新导出。
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+from pathlib import Path
+
+import _bootstrap  # noqa: F401
+
+
+DEFAULT_DB_PATH = Path("data/data.sqlite")
+DEFAULT_OUT_DIR = Path("data/parquet")
+DEFAULT_TABLES = ["daily_a", "daily_h"]
+
+
+def _quote_literal(s: str) -> str:
+    return "'" + s.replace("'", "''") + "'"
+
+
+def export_tables(db_path: Path, out_dir: Path, tables: list[str]) -> dict[str, int]:
+    """Write each table to out_dir/<table>/ partitioned by ts_code; returns row counts."""
+    try:
+        import duckdb  # type: ignore
+    except ImportError as e:  # pragma: no cover - optional dependency
+        raise SystemExit("需要安装 duckdb: pip install duckdb") from e
+
+    duck = duckdb.connect()
+    counts: dict[str, int] = {}
+    try:
+        try:
+            duck.execute(
+                f"ATTACH {_quote_literal(str(db_path.resolve()))} AS src (TYPE SQLITE, READ_ONLY)"
+            )
+        except duckdb.Error as e:
+            raise SystemExit(f"DuckDB 无法挂载 SQLite (需要 sqlite 扩展): {e}") from e
+        existing = {
+            row[0]
+            for row in duck.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_catalog = 'src'"
+            ).fetchall()
+        }
+        for table in tables:
+            if table not in existing:
+                print(f"{table}: 不存在, 跳过")
+                continue
+            dest = out_dir / table
+            # 整表快照: 先清空旧分区, 避免已删除的代码残留
+            if dest.exists():
+                shutil.rmtree(dest)
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            duck.execute(
+                f'COPY (SELECT * FROM src."{table}" ORDER BY ts_code, trade_date) '
+                f"TO {_quote_literal(str(dest))} "
+                "(FORMAT PARQUET, PARTITION_BY (ts_code), COMPRESSION ZSTD)"
+            )
+            n = duck.execute(f'SELECT COUNT(*) FROM src."{table}"').fetchone()[0]
+            counts[table] = int(n)
+            print(f"{table}: rows={n} -> {dest}")
+    finally:
+        duck.close()
+    return counts
+
+
+def _parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="导出日频表为按 ts_code 分区的 Parquet (需要 duckdb)")
+    p.add_argument("--db", type=Path, default=DEFAULT_DB_PATH)
+    p.add_argument("--out", type=Path, default=DEFAULT_OUT_DIR, help="输出根目录")
+    p.add_argument(
+        "--tables",
+        nargs="+",
+        default=DEFAULT_TABLES,
+        help="要导出的表 (需含 ts_code/trade_date 列)",
+    )
+    return p.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    if not args.db.exists():
+        print("数据库文件不存在:", args.db)
+        raise SystemExit(1)
+    export_tables(args.db, args.out, list(args.tables))
+
+
+if __name__ == "__main__":
+    main()
@@ -541,22 +541,24 @@ def simulate_strategy(
 
 def load_benchmark_monthly(con: sqlite3.Connection, start_date: str, end_date: str) -> pd.DataFrame:
     hs300 = pd.read_sql_query(
-        f"""
+        """
         SELECT trade_date, ts_code, close
         FROM index_daily
-        WHERE ts_code='000300.SH' AND trade_date BETWEEN '{start_date}' AND '{end_date}'
+        WHERE ts_code=? AND trade_date BETWEEN ? AND ?
         ORDER BY trade_date
         """,
         con,
+        params=["000300.SH", start_date, end_date],
     )
     ixic = pd.read_sql_query(
-        f"""
+        """
         SELECT trade_date, ts_code, close
         FROM index_global
-        WHERE ts_code='IXIC' AND trade_date BETWEEN '{start_date}' AND '{end_date}'
+        WHERE ts_code=? AND trade_date BETWEEN ? AND ?
         ORDER BY trade_date
         """,
         con,
+        params=["IXIC", start_date, end_date],
     )
     raw = pd.concat([hs300, ixic], ignore_index=True)
     raw["trade_date"] = pd.to_datetime(raw["trade_date"], format="%Y%m%d")
@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from qs.sqlite_utils import connect_sqlite, read_sql_df
+from qs.sqlite_utils import get_shared_ro_connection, read_sql_df
 
 DB_PATH = Path("data/data.sqlite")  # ← 确认路径
 TABLE = "stock_basic_a"  # ← 确认表名
@@ -9,7 +9,7 @@ TABLE = "stock_basic_a"  # ← 确认表名
 def main() -> None:
     print(f"Connecting to {DB_PATH.resolve()}  (exists={DB_PATH.exists()})")
 
-    con = connect_sqlite(DB_PATH, read_only=True)
+    con = get_shared_ro_connection(DB_PATH)
     tables = [
         row[0]
         for row in con.execute(
@@ -23,7 +23,6 @@ def main() -> None:
         return
 
     df = read_sql_df(con, f'SELECT * FROM "{TABLE}" LIMIT 5')
-    con.close()
 
     print("\n--- df.head() ---")
     print(df)
@@ -1,23 +1,28 @@
 import argparse
 import csv
+import sqlite3
 from pathlib import Path
 from typing import Iterable, Sequence
 
 import _bootstrap  # noqa: F401
 
-from qs.sqlite_utils import connect_sqlite
+from qs.sqlite_utils import get_shared_ro_connection
 
 
 DEFAULT_DB_PATH = Path("data/data.sqlite")
 DEFAULT_TABLE = "bak_daily_a"  # A 股特色扩展行情, 含 pe 字段
 
 
+EXPORT_FETCH_SIZE = 5000
+
+
 def _iter_rows(
     con, sql: str, params: Sequence[object] | None = None
-) -> tuple[list[str], Iterable[tuple[object, ...]]]:
+) -> tuple[list[str], sqlite3.Cursor]:
+    """Run sql and return (columns, cursor); rows are pulled lazily by the caller."""
     cur = con.execute(sql, list(params) if params else [])
     cols = [d[0] for d in cur.description] if cur.description else []
-    return cols, cur.fetchall()
+    return cols, cur
 
 
 def _print_table(cols: list[str], rows: Iterable[tuple[object, ...]]) -> None:
@@ -29,20 +34,16 @@ def _print_table(cols: list[str], rows: Iterable[tuple[object, ...]]) -> None:
         print("(no rows)")
         return
 
-    # simple fixed-width formatting (no external deps)
+    # simple fixed-width formatting (no external deps); widths computed per column
     str_rows = [[("" if v is None else str(v)) for v in r] for r in rows_list]
-    widths = [len(c) for c in cols]
-    for r in str_rows:
-        for i, v in enumerate(r):
-            widths[i] = max(widths[i], len(v))
+    widths = [max(len(c), *map(len, col)) for c, col in zip(cols, zip(*str_rows))]
 
     def fmt_row(r: list[str]) -> str:
-        return "  ".join(v.ljust(widths[i]) for i, v in enumerate(r))
+        return "  ".join(v.ljust(w) for v, w in zip(r, widths))
 
-    print(fmt_row(cols))
-    print("  ".join("-" * w for w in widths))
-    for r in str_rows:
-        print(fmt_row(r))
+    lines = [fmt_row(cols), "  ".join("-" * w for w in widths)]
+    lines.extend(fmt_row(r) for r in str_rows)
+    print("\n".join(lines))
 
 
 def _summary(con) -> None:
@@ -93,11 +94,6 @@ def _export_all_latest(con, out_path: Path) -> None:
     cols, rows = _iter_rows(
         con,
         f"""
-        WITH latest AS (
-          SELECT ts_code, MAX(trade_date) AS trade_date
-          FROM "{DEFAULT_TABLE}"
-          GROUP BY ts_code
-        )
         SELECT
           d.ts_code,
           s.name AS stock_name,
@@ -105,21 +101,28 @@ def _export_all_latest(con, out_path: Path) -> None:
           d.pe,
           d.total_mv,
           d.float_mv
-        FROM "{DEFAULT_TABLE}" d
-        JOIN latest l
-          ON d.ts_code = l.ts_code AND d.trade_date = l.trade_date
+        FROM (
+          -- SQLite bare columns: with a lone MAX() the other columns come from
+          -- the row holding the max, so one grouped pass replaces the self-join.
+          SELECT ts_code, MAX(trade_date) AS trade_date, pe, total_mv, float_mv
+          FROM "{DEFAULT_TABLE}"
+          GROUP BY ts_code
+        ) d
         LEFT JOIN "stock_basic_a" s
           ON s.ts_code = d.ts_code
         ORDER BY d.ts_code
         """,
     )
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    rows_list = list(rows)
+    n_rows = 0
     with out_path.open("w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
         w.writerow(cols)
-        w.writerows(rows_list)
-    print(f"✅ 导出完成: {out_path} (rows={len(rows_list)})")
+        # stream in fixed-size batches: memory stays flat regardless of result size
+        for batch in iter(lambda: rows.fetchmany(EXPORT_FETCH_SIZE), []):
+            w.writerows(batch)
+            n_rows += len(batch)
+    print(f"✅ 导出完成: {out_path} (rows={n_rows})")
 
 
 def main() -> None:
@@ -140,27 +143,24 @@ def main() -> None:
     args = parser.parse_args()
 
     print(f"Connecting to {args.db.resolve()}  (exists={args.db.exists()})")
-    con = connect_sqlite(args.db, read_only=True)
-    try:
-        tables = [
-            row[0]
-            for row in con.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
-            ).fetchall()
-        ]
-        if DEFAULT_TABLE not in tables:
-            print(f"❌ 表 {DEFAULT_TABLE} 不存在。当前 tables={tables}")
-            return
-
-        if args.ts_code:
-            _latest_one(con, args.ts_code, n=max(1, args.n))
-            return
-
-        _summary(con)
-        if args.export_latest_csv:
-            _export_all_latest(con, args.export_latest_csv)
-    finally:
-        con.close()
+    con = get_shared_ro_connection(args.db)
+    tables = [
+        row[0]
+        for row in con.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' ORDER BY name"
+        ).fetchall()
+    ]
+    if DEFAULT_TABLE not in tables:
+        print(f"❌ 表 {DEFAULT_TABLE} 不存在。当前 tables={tables}")
+        return
+
+    if args.ts_code:
+        _latest_one(con, args.ts_code, n=max(1, args.n))
+        return
+
+    _summary(con)
+    if args.export_latest_csv:
+        _export_all_latest(con, args.export_latest_csv)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,7 @@ from __future__ import annotations
 import _bootstrap  # noqa: F401
 
 from pathlib import Path
-from qs.backtester.data import Bar, DataFeed
+from qs.backtester.data import DataFeed
 from qs.backtester.broker import Broker
 from qs.backtester.engine import BacktestEngine
 from qs.backtester.stats import (
@@ -17,42 +17,29 @@ START_DATE = "20200101"
 A_CODE = "601628.SH"
 H_CODE = "02628.HK"
 INITIAL_CASH = 1_000_000.0
-from qs.sqlite_utils import connect_sqlite, read_sql_df
+from qs.sqlite_utils import read_sql_df_columnar
 
 SRC_DB = Path("data/data.sqlite")
-
-con = connect_sqlite(SRC_DB, read_only=True)
-a_df = read_sql_df(
-    con,
-    f"""
+_A_BARS_SQL = """
 SELECT trade_date, open, high, low, close, pct_chg
 FROM daily_a
-WHERE ts_code='{A_CODE}' AND trade_date >= '{START_DATE}'
+WHERE ts_code=? AND trade_date >= ?
 ORDER BY trade_date
 """
-)
-
-h_df = read_sql_df(
-    con,
-    f"""
+_H_PRICES_SQL = """
 SELECT trade_date, open, close, pct_chg
 FROM daily_h
-WHERE ts_code='{H_CODE}' AND trade_date >= '{START_DATE}'
+WHERE ts_code=? AND trade_date >= ?
 ORDER BY trade_date
 """
-)
-con.close()
 
-h_open = {r.trade_date: r.open for r in h_df.itertuples(index=False)}
-h_pct = {r.trade_date: r.pct_chg for r in h_df.itertuples(index=False)}
-h_close = {r.trade_date: r.close for r in h_df.itertuples(index=False)}
-ctx = PairContext(h_open=h_open, h_pct=h_pct, h_close=h_close)
+a_df = read_sql_df_columnar(SRC_DB, _A_BARS_SQL, [A_CODE, START_DATE])
+h_df = read_sql_df_columnar(SRC_DB, _H_PRICES_SQL, [H_CODE, START_DATE])
+
+ctx = PairContext.from_frame(h_df)
 
-bars = [
-    Bar(r.trade_date, r.open, r.high, r.low, r.close, r.pct_chg)
-    for r in a_df.itertuples(index=False)
-]
-feed = DataFeed(bars)
+# 列式 feed: 逐日按需生成 Bar, 不预先构造整段 Bar 列表
+feed = DataFeed.from_arrays(*(a_df[c].to_numpy() for c in a_df.columns))
 
 broker = Broker(INITIAL_CASH, enable_trade_log=True)
 # 不设置默认 symbol，使用多标的 API
@@ -62,7 +49,7 @@ curve = engine.run()
 
 final_equity = curve[-1].equity if curve else INITIAL_CASH
 print(
-    f"Bars: {len(bars)}  Final Equity: {final_equity:.2f}  Return: {(final_equity/INITIAL_CASH-1)*100:.2f}%  Total Fees: {broker.total_fees:.2f}"
+    f"Bars: {len(feed)}  Final Equity: {final_equity:.2f}  Return: {(final_equity/INITIAL_CASH-1)*100:.2f}%  Total Fees: {broker.total_fees:.2f}"
 )
 
 annual_returns = compute_annual_returns(curve)
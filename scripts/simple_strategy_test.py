@@ -3,24 +3,33 @@ from __future__ import annotations
 import _bootstrap  # noqa: F401
 
 import argparse
+from operator import attrgetter
 from pathlib import Path
-from qs.backtester.data import Bar, DataFeed
-from qs.backtester.broker import Broker
-from qs.backtester.engine import BacktestEngine
-from qs.strategy.simple_strategy import SimpleStrategy
-from qs.backtester.stats import (
-    compute_annual_returns,
-    compute_max_drawdown,
-    compute_risk_metrics,
-)
 
 START_DATE = "20200101"
 TS_CODE = "601628.SH"  # 中国人寿
 INITIAL_CASH = 1_000_000.0
 
-from qs.sqlite_utils import connect_sqlite, read_sql_df
-
 SRC_DB = Path("data/data.sqlite")
+_TRADE_COLUMNS = (
+    "trade_date",
+    "action",
+    "symbol",
+    "price",
+    "exec_price",
+    "size",
+    "gross_amount",
+    "fees",
+    "cash_after",
+    "position_after",
+    "equity_after",
+)
+_BARS_SQL = """
+SELECT trade_date, open, high, low, close, pct_chg
+FROM daily_a
+WHERE ts_code=? AND trade_date >= ?
+ORDER BY trade_date
+"""
 
 
 def parse_args():
@@ -31,24 +40,26 @@ def parse_args():
 
 args = parse_args()
 
-# 读取数据
-con = connect_sqlite(SRC_DB, read_only=True)
-df = read_sql_df(
-    con,
-    f"""
-SELECT trade_date, open, high, low, close, pct_chg
-FROM daily_a
-WHERE ts_code='{TS_CODE}' AND trade_date >= '{START_DATE}'
-ORDER BY trade_date
-"""
+# 重依赖放在参数解析之后: --help / 参数错误时无需加载 pandas/numpy 与回测框架
+import numpy as np
+import pandas as pd
+
+from qs.backtester.data import DataFeed
+from qs.backtester.broker import Broker
+from qs.backtester.engine import BacktestEngine
+from qs.strategy.simple_strategy import SimpleStrategy
+from qs.sqlite_utils import read_sql_df_columnar
+from qs.backtester.stats import (
+    compute_annual_returns,
+    compute_max_drawdown,
+    compute_risk_metrics,
 )
-con.close()
 
-bars = [
-    Bar(r.trade_date, r.open, r.high, r.low, r.close, r.pct_chg)
-    for r in df.itertuples(index=False)
-]
-feed = DataFeed(bars)
+# 读取数据
+df = read_sql_df_columnar(SRC_DB, _BARS_SQL, [TS_CODE, START_DATE])
+
+# 列式 feed: 逐日按需生成 Bar, 不预先构造整段 Bar 列表
+feed = DataFeed.from_arrays(*(df[c].to_numpy() for c in df.columns))
 broker = Broker(INITIAL_CASH, enable_trade_log=True, symbol=TS_CODE)
 strategy = SimpleStrategy(TS_CODE)
 engine = BacktestEngine(feed, broker, strategy)
@@ -57,7 +68,7 @@ curve = engine.run()
 # 输出结果概要
 final_equity = curve[-1].equity if curve else INITIAL_CASH
 print(
-    f"Bars: {len(bars)}  Final Equity: {final_equity:.2f}  Return: {(final_equity/INITIAL_CASH-1)*100:.2f}%  Total Fees: {broker.total_fees:.2f}"
+    f"Bars: {len(feed)}  Final Equity: {final_equity:.2f}  Return: {(final_equity/INITIAL_CASH-1)*100:.2f}%  Total Fees: {broker.total_fees:.2f}"
 )
 
 # 年度收益
@@ -79,54 +90,24 @@ if risk:
         f"CAGR: {risk['CAGR']*100:.2f}%  AnnReturn: {risk['AnnReturn']*100:.2f}%  AnnVol: {risk['AnnVol']*100:.2f}%  Sharpe: {risk['Sharpe']:.2f}  WinRate: {risk['WinRate']*100:.2f}%"
     )
 
-# 保存 equity 曲线 CSV
-import csv
-
+# 保存 equity 曲线 CSV (整列交给 pandas 一次性格式化, 不再逐行 f-string)
 out_path = Path("data/equity_simple_strategy.csv")
-with out_path.open("w", newline="", encoding="utf-8") as f:
-    w = csv.writer(f)
-    w.writerow(["trade_date", "equity"])
-    for p in curve:
-        w.writerow([p.trade_date, f"{p.equity:.2f}"])
+pd.DataFrame(
+    {
+        "trade_date": [p.trade_date for p in curve],
+        "equity": np.fromiter((p.equity for p in curve), dtype=float, count=len(curve)),
+    }
+).to_csv(out_path, index=False, float_format="%.2f")
 print(f"Equity curve saved to {out_path}")
 
 # 导出交易明细 CSV
 trades_out = Path("data/trades_simple_strategy.csv")
-from qs.backtester.broker import TradeRecord  # type: ignore
-
-with trades_out.open("w", newline="", encoding="utf-8") as f:
-    import csv as _csv
-
-    w = _csv.writer(f)
-    w.writerow(
-        [
-            "trade_date",
-            "action",
-            "symbol",
-            "price",
-            "exec_price",
-            "size",
-            "gross_amount",
-            "fees",
-            "cash_after",
-            "position_after",
-            "equity_after",
-        ]
-    )
-    for tr in broker.trades:
-        w.writerow(
-            [
-                tr.trade_date,
-                tr.action,
-                tr.symbol,
-                f"{tr.price:.4f}",
-                f"{tr.exec_price:.4f}",
-                int(tr.size),
-                f"{tr.gross_amount:.2f}",
-                f"{tr.fees:.2f}",
-                f"{tr.cash_after:.2f}",
-                int(tr.position_after),
-                f"{tr.equity_after:.2f}",
-            ]
-        )
+trade_df = pd.DataFrame(
+    list(map(attrgetter(*_TRADE_COLUMNS), broker.trades)), columns=list(_TRADE_COLUMNS)
+)
+trade_df = trade_df.astype({"size": "int64", "position_after": "int64"})
+for col in ("price", "exec_price"):
+    # 价格保留 4 位, 其余金额列走下面的 %.2f
+    trade_df[col] = np.char.mod("%.4f", trade_df[col].to_numpy(dtype=float))
+trade_df.to_csv(trades_out, index=False, float_format="%.2f")
 print(f"Trade details saved to {trades_out}")
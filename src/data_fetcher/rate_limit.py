@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` calls per `per` seconds.
+
+    Unlike a fixed `time.sleep` after every call, callers only block when the
+    bucket is empty, so short bursts (and concurrent workers) run at full speed
+    while the long-run rate stays under the API quota.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, *, capacity: float | None = None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive")
+        self._fill_per_s = float(rate) / float(per)
+        self._capacity = float(capacity if capacity is not None else max(1.0, rate / 10.0))
+        self._tokens = self._capacity
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._stamp) * self._fill_per_s)
+        self._stamp = now
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self._fill_per_s
+            time.sleep(wait)
+
+    def backoff(self, seconds: float) -> None:
+        """Pause every caller for about `seconds` (e.g. after a quota/transient error).
+
+        Drives the bucket negative instead of sleeping in the failing thread, so
+        concurrent workers back off together rather than retrying into the limit.
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - seconds * self._fill_per_s
+
+
+__all__ = ["RateLimiter"]
@@ -4,6 +4,10 @@ import os
 from pathlib import Path
 
 _DOTENV_LOADED = False
+# repo_root/.env, resolved once at import (src/data_fetcher/settings.py -> repo root)
+_DOTENV_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".env"
+)
 
 
 def _load_env_file(path: Path) -> None:
@@ -45,10 +49,8 @@ def _ensure_dotenv_loaded() -> None:
         return
     _DOTENV_LOADED = True
 
-    repo_root = Path(__file__).resolve().parents[2]
-    dotenv_path = repo_root / ".env"
-    if dotenv_path.exists():
-        _load_env_file(dotenv_path)
+    if os.path.isfile(_DOTENV_PATH):
+        _load_env_file(Path(_DOTENV_PATH))
 
 
 def _get_env(name: str) -> str | None:
@@ -59,9 +61,24 @@ def _get_env(name: str) -> str | None:
     return value or None
 
 
-def get_tushare_token() -> str:
+def _get_setting(*names: str) -> str | None:
+    """First non-empty env var among names; .env is read only if none is set."""
+    for name in names:
+        value = _get_env(name)
+        if value:
+            return value
+    if _DOTENV_LOADED:
+        return None
     _ensure_dotenv_loaded()
-    token = _get_env("tushare_api_token") or _get_env("TUSHARE_API_TOKEN")
+    for name in names:
+        value = _get_env(name)
+        if value:
+            return value
+    return None
+
+
+def get_tushare_token() -> str:
+    token = _get_setting("tushare_api_token", "TUSHARE_API_TOKEN")
     if not token:
         raise RuntimeError(
             "Missing `tushare_api_token`. Create `.env` from `.env.example` and set it, "
@@ -71,5 +88,4 @@ def get_tushare_token() -> str:
 
 
 def get_start_date(default: str = "20120101") -> str:
-    _ensure_dotenv_loaded()
-    return _get_env("start_date") or _get_env("START_DATE") or default
+    return _get_setting("start_date", "START_DATE") or default
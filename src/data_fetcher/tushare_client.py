@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import pandas as pd
+import requests
+import tushare as ts
+from requests.adapters import HTTPAdapter
+from tushare.pro import client as _ts_client
+
+# Keep-alive connections kept per host: must cover the daily sync's peak concurrency
+# (TABLE_WORKERS * FETCH_WORKERS = 4 * 8), or urllib3 discards connections when full.
+POOL_MAXSIZE = 32
+
+_SESSION: requests.Session | None = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Process-wide keep-alive session (thread-safe lazy init)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _SESSION = s
+    return _SESSION
+
+
+class SessionDataApi(_ts_client.DataApi):
+    """`tushare` DataApi that reuses one pooled HTTP connection.
+
+    Upstream `DataApi.query` calls module-level `requests.post`, so every page
+    pays a fresh TCP (and TLS) handshake. This subclass sends the identical
+    request through a shared `requests.Session`; the response handling mirrors
+    tushare 1.4.x (pinned in environment.yml).
+
+    Token and timeout are kept on this instance; only the endpoint URL comes
+    from upstream's private `__http_url`, checked at construction so an
+    incompatible tushare release fails immediately instead of mid-sync.
+    """
+
+    def __init__(self, token, timeout=30):
+        super().__init__(token=token, timeout=timeout)
+        http_url = getattr(self, "_DataApi__http_url", None)
+        if not isinstance(http_url, str) or not http_url:
+            raise RuntimeError(
+                f"tushare {getattr(ts, '__version__', '?')} DataApi has no __http_url; "
+                "SessionDataApi supports tushare 1.4.x"
+            )
+        self._http_url = http_url
+        self._token = token
+        self._timeout = timeout
+
+    def query(self, api_name, fields="", **kwargs):
+        req_params = {
+            "api_name": api_name,
+            "token": self._token,
+            "params": kwargs,
+            "fields": fields,
+        }
+        res = _get_session().post(
+            f"{self._http_url}/{api_name}",
+            json=req_params,
+            timeout=self._timeout,
+        )
+        if not res:
+            return pd.DataFrame()
+        result = json.loads(res.text)
+        if result["code"] != 0:
+            raise Exception(result["msg"])
+        data = result["data"]
+        return pd.DataFrame(data["items"], columns=data["fields"])
+
+
+def pro_api(token: str, timeout: int = 30) -> SessionDataApi:
+    """Drop-in for `ts.pro_api(token)` with HTTP keep-alive."""
+    if not token:
+        raise ValueError("token is required")
+    return SessionDataApi(token=token, timeout=timeout)
+
+
+__all__ = ["SessionDataApi", "pro_api"]
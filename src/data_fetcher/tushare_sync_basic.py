@@ -6,9 +6,13 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import sqlite3
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -29,6 +33,8 @@ if not logging.getLogger().handlers:
 # ----------------------------------------------------------------------
 # 读取配置
 # ----------------------------------------------------------------------
+from data_fetcher.rate_limit import RateLimiter
+from data_fetcher.tushare_client import pro_api
 from data_fetcher.settings import get_tushare_token
 
 # ----------------------------------------------------------------------
@@ -37,7 +43,12 @@ from data_fetcher.settings import get_tushare_token
 SQLITE_PATH = Path("data/data.sqlite")
 LIMIT = 3000
 MAX_RETRY = 3
-SLEEP = 0.6  # 等价于每分钟 ~100 次调用
+SLEEP = 0.6  # 失败重试退避基数
+CALLS_PER_MIN = 100  # TuShare 配额: 令牌桶限流, 仅在桶空时阻塞
+FETCH_WORKERS = 4  # 首页满页后并发预取的页数
+LIST_SYNC_MARKER = "*"  # sync_date 中列表类表的 ts_code 占位
+
+_LIMITER = RateLimiter(CALLS_PER_MIN, 60.0)
 
 # ----------------------------------------------------------------------
 # 市场配置
@@ -140,81 +151,125 @@ MARKET_CONFIG: Dict[str, Dict[str, Any]] = {
 # ----------------------------------------------------------------------
 
 
+@functools.lru_cache(maxsize=1)
+def _get_pro(token: str):
+    """进程内复用同一个 DataApi (及其 keep-alive 会话); token 变化时重建。"""
+    return pro_api(token)
+
+
+def _fetch_page(
+    pro: ts.pro_api,
+    api_name: str,
+    params: Dict[str, Any],
+    fields_csv: str,
+    offset: int,
+) -> pd.DataFrame:
+    """拉取单页 (共享令牌桶限流 + 重试)。"""
+
+    for attempt in range(1, MAX_RETRY + 1):
+        _LIMITER.acquire()
+        try:
+            return getattr(pro, api_name)(
+                **params,
+                offset=offset,
+                limit=LIMIT,
+                fields=fields_csv,
+            )
+        except Exception as exc:
+            logging.warning(
+                "%s 调用失败 offset=%s attempt=%s/%s: %s",
+                api_name,
+                offset,
+                attempt,
+                MAX_RETRY,
+                exc,
+            )
+            # 失败时整体退避: 所有并发线程的下一次 acquire 一并等待
+            _LIMITER.backoff(SLEEP * 2)
+    raise RuntimeError(f"连续 {MAX_RETRY} 次失败，终止。offset={offset}")
+
+
 def _fetch_table(
     pro: ts.pro_api,
     api_name: str,
     params: Dict[str, Any],
     fields: List[str],
-) -> pd.DataFrame:
-    """分页拉取指定表并拼接返回。"""
-
-    offset, chunks = 0, []
-    while True:
-        df_chunk = None
-        for attempt in range(1, MAX_RETRY + 1):
-            try:
-                df_chunk = getattr(pro, api_name)(
-                    **params,
-                    offset=offset,
-                    limit=LIMIT,
-                    fields=",".join(fields),
-                )
-                break
-            except Exception as exc:
-                logging.warning(
-                    "%s 调用失败 offset=%s attempt=%s/%s: %s",
-                    api_name,
-                    offset,
-                    attempt,
-                    MAX_RETRY,
-                    exc,
-                )
-                time.sleep(SLEEP * 2)
+    *,
+    expected_rows: int = 0,
+) -> List[pd.DataFrame]:
+    """分页拉取指定表, 按 offset 顺序返回各页 (不拼接, 去重交给唯一索引)。
 
-        if df_chunk is None:
-            raise RuntimeError(f"连续 {MAX_RETRY} 次失败，终止。offset={offset}")
+    expected_rows (通常为本地表现有行数) 用于预估页数: 预估范围内的 offset 一次性
+    并发提交 (共享限流), 无需先串行拉取首页; 若预估的最后一页仍满页, 再继续保持
+    FETCH_WORKERS 个后续 offset 在途。按 offset 顺序消费, 遇到不满页即停止并取消多余预取。
+    """
 
-        chunks.append(df_chunk)
-        logging.info("[%s] 拉取 %s 行 offset=%s", api_name, len(df_chunk), offset)
+    fields_csv = ",".join(fields)
+    # ceil((n + 1) / LIMIT): 现有行数 + 可能新增的尾页
+    first_window = max(1, -(-(int(expected_rows) + 1) // LIMIT))
+    chunks: List[pd.DataFrame] = []
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
 
-        if len(df_chunk) < LIMIT:
-            all_df = pd.concat(chunks, ignore_index=True)
-            if "ts_code" in all_df.columns:
-                all_df = all_df.drop_duplicates(subset=["ts_code"])
-            return all_df
+        def _submit(off: int):
+            return off, pool.submit(_fetch_page, pro, api_name, params, fields_csv, off)
 
-        offset += LIMIT
-        time.sleep(SLEEP)
+        pending = deque(_submit(LIMIT * i) for i in range(first_window))
+        next_offset = LIMIT * first_window
+        while pending:
+            offset, future = pending.popleft()
+            df_chunk = future.result()
+            chunks.append(df_chunk)
+            logging.info("[%s] 拉取 %s 行 offset=%s", api_name, len(df_chunk), offset)
+            if len(df_chunk) < LIMIT:
+                for _, extra in pending:
+                    extra.cancel()
+                break
+            if not pending:
+                # 超出预估: 表变大了, 恢复常规的 FETCH_WORKERS 页预取
+                pending.extend(_submit(next_offset + LIMIT * i) for i in range(FETCH_WORKERS))
+                next_offset += LIMIT * FETCH_WORKERS
+
+    return chunks
 
 
 def _table_exists(con: sqlite3.Connection, table: str) -> bool:
     return table_exists(con, table)
 
 
-def _upsert(df: pd.DataFrame, table: str) -> int:
-    con = connect_sqlite(SQLITE_PATH)
-    try:
-        if not table_exists(con, table):
-            df.head(0).to_sql(table, con, if_exists="fail", index=False)
-            if "ts_code" in df.columns:
-                ensure_unique_index(
-                    con, table=table, columns=["ts_code"], index_name=f"{table}_uq"
-                )
-        inserted = insert_df_ignore(
+def _row_count(con: sqlite3.Connection, table: str) -> int:
+    if not table_exists(con, table):
+        return 0
+    return int(con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0])
+
+
+def _upsert(con: sqlite3.Connection, chunks: List[pd.DataFrame], table: str) -> int:
+    """逐页 INSERT OR IGNORE 写入 (跨页重复由 ts_code 唯一索引吸收), 返回表总行数。"""
+    chunks = [df for df in chunks if not df.empty]
+    if not chunks:
+        # 接口异常/无数据: 不建表、不写库
+        logging.warning("%s 拉取结果为空, 跳过写入", table)
+        return _row_count(con, table)
+    first = chunks[0]
+    if not table_exists(con, table):
+        # 不用 to_sql: 它会自行 COMMIT, 打断 data_sync 的单事务
+        con.execute(pd.io.sql.get_schema(first.head(0), table, con=con))
+        if "ts_code" in first.columns:
+            ensure_unique_index(
+                con, table=table, columns=["ts_code"], index_name=f"{table}_uq"
+            )
+    inserted = 0
+    for df in chunks:
+        inserted += insert_df_ignore(
             con,
             df=df,
             table=table,
             unique_by=["ts_code"] if "ts_code" in df.columns else None,
         )
-        if inserted == 0:
-            logging.info("%s 已最新 无新增", table)
-        else:
-            logging.info("%s 插入 %s 行", table, inserted)
-        cnt = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
-        con.commit()
-    finally:
-        con.close()
-    return cnt
+    if inserted == 0:
+        logging.info("%s 已最新 无新增", table)
+    else:
+        logging.info("%s 插入 %s 行", table, inserted)
+    return con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
 
 
 # ----------------------------------------------------------------------
@@ -222,12 +277,87 @@ def _upsert(df: pd.DataFrame, table: str) -> int:
 # ----------------------------------------------------------------------
 
 
-def data_sync() -> None:
-    pro = ts.pro_api(get_tushare_token())
-    for name, cfg in MARKET_CONFIG.items():
-        df = _fetch_table(pro, cfg["api_name"], cfg["params"], cfg["fields"])
-        cnt = _upsert(df, cfg["table"])
-        logging.info("[%s] 同步完成 当前行数=%s", name, cnt)
+def _ensure_sync_table(con: sqlite3.Connection) -> None:
+    # 与 tushare_sync_daily 共用 sync_date; 列表类表以 ts_code=LIST_SYNC_MARKER 记一行
+    con.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_date (
+            table_name       VARCHAR,
+            ts_code          VARCHAR,
+            last_update_date VARCHAR,
+            PRIMARY KEY (table_name, ts_code)
+        )
+        """
+    )
+
+
+def _synced_on(con: sqlite3.Connection, table: str, day: str) -> bool:
+    row = con.execute(
+        "SELECT last_update_date FROM sync_date WHERE table_name=? AND ts_code=?",
+        [table, LIST_SYNC_MARKER],
+    ).fetchone()
+    return bool(row and row[0] == day and _row_count(con, table) > 0)
+
+
+def data_sync(*, force: bool = False) -> None:
+    """同步全部基础列表; 当天已成功同步且表非空的市场直接跳过 (force=True 强制重拉)。"""
+    today = datetime.now().strftime("%Y%m%d")
+    # 整个同步复用一个写连接 (connect_sqlite 已设置 WAL / synchronous=NORMAL / cache_size)
+    con = connect_sqlite(SQLITE_PATH)
+    try:
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA busy_timeout=5000")
+        _ensure_sync_table(con)
+        con.commit()
+        todo: Dict[str, Dict[str, Any]] = {}
+        for name, cfg in MARKET_CONFIG.items():
+            if not force and _synced_on(con, cfg["table"], today):
+                logging.info("[%s] %s 今日已同步, 跳过", name, cfg["table"])
+            else:
+                todo[name] = cfg
+        if not todo:
+            return
+
+        pro = _get_pro(get_tushare_token())
+        # 先拉取全部市场 (数据量小), 再在单个事务中落库: 一次提交, 且网络请求期间不持有写锁
+        # 各市场互不依赖: 并发拉取, 共享 _LIMITER 保证总调用频率不超配额
+        with ThreadPoolExecutor(max_workers=len(todo)) as pool:
+            futures = [
+                (
+                    name,
+                    cfg["table"],
+                    pool.submit(
+                        _fetch_table,
+                        pro,
+                        cfg["api_name"],
+                        cfg["params"],
+                        cfg["fields"],
+                        expected_rows=_row_count(con, cfg["table"]),
+                    ),
+                )
+                for name, cfg in todo.items()
+            ]
+            fetched = [(name, table, fut.result()) for name, table, fut in futures]
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            counts = [(name, _upsert(con, chunks, table)) for name, table, chunks in fetched]
+            con.executemany(
+                """
+                INSERT INTO sync_date (table_name, ts_code, last_update_date)
+                VALUES (?, ?, ?)
+                ON CONFLICT (table_name, ts_code)
+                DO UPDATE SET last_update_date = EXCLUDED.last_update_date
+                """,
+                [(table, LIST_SYNC_MARKER, today) for _, table, _ in fetched],
+            )
+            con.commit()
+        except Exception:
+            con.rollback()
+            raise
+        for name, cnt in counts:
+            logging.info("[%s] 同步完成 当前行数=%s", name, cnt)
+    finally:
+        con.close()
 
 
 # 若希望直接作为脚本运行，可保留以下守护；被 import 时不会影响
@@ -23,32 +23,66 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import random
 import sqlite3
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Iterable, Optional
+from typing import Any, Dict, Iterator, List, Iterable, Optional
 
 import pandas as pd  # type: ignore
 import tushare as ts  # type: ignore
 
+from data_fetcher.rate_limit import RateLimiter
+from data_fetcher.tushare_client import pro_api
 from data_fetcher.settings import get_start_date, get_tushare_token  # noqa: E402
-from qs.sqlite_utils import connect_sqlite, ensure_unique_index, insert_df_ignore, table_exists
+from qs.sqlite_utils import (
+    connect_sqlite,
+    df_to_records,
+    ensure_unique_index,
+    ensure_unique_index_with_dedupe,
+    insert_df_ignore,
+    refresh_trade_calendar,
+    table_exists,
+)
 
 # ───────────────────────────────────────────── 配置常量 ──
 START_DATE: str = get_start_date("20120101")
 SQLITE_PATH = Path("data/data.sqlite")
 # 全局默认 (可被每个表在 TABLE_CONFIG 中以 limit / sleep / sleep_on_fail 覆盖)
 DEFAULT_LIMIT = 3000
-DEFAULT_SLEEP = 0.01
-DEFAULT_SLEEP_ON_FAIL = 2  # 或者 DEFAULT_SLEEP * 2
+# 成功请求之间不再固定 sleep: 调用频率由共享令牌桶 _LIMITER 控制, 只有失败后才退避;
+# 表级 sleep>0 时仍在每页/每日请求后额外等待
+DEFAULT_SLEEP = 0.0
+DEFAULT_SLEEP_ON_FAIL = 2  # 失败重试的退避基数 (秒, 指数增长 + 抖动)
 MAX_RETRY = 3
-BATCH_SIZE = 100  # 每 100 只股票提交一次事务
+FETCH_WORKERS = 8  # 逐标的抓取的并发线程数 (写库仍由主线程串行完成)
+TABLE_WORKERS = 4  # 并发同步的表数 (各表独立连接; 写库经 _WRITE_LOCK 串行)
+# 同时在途请求最多 TABLE_WORKERS * FETCH_WORKERS, 须不超过 tushare_client.POOL_MAXSIZE
+CALLS_PER_MIN = 500  # TuShare 配额: 所有表/线程共享令牌桶, 仅在桶空时阻塞
 # Tushare Pro `limit` is effectively capped (commonly 2000). When our configured
 # limit exceeds the API cap, the first page may return <limit rows even though
 # more pages exist; pagination must use the effective page size.
 TS_API_MAX_PAGE_SIZE = 2000
+# 追赶窗口不超过该天数且标的数多于交易日数时, 按 trade_date 拉全市场再按 ts_code 分发
+# (日常增量: 每日 1 次请求代替每只标的 1 次); 仅对配置了 by_trade_date 的表生效
+PIVOT_MAX_DAYS = 10
+# 逐标的增量请求从已有最新日期往前回看的交易日数 (含最新日): 重叠行由唯一索引去重,
+# 此前漏写/晚到的数据在后续运行中自动补齐, 无需 --rebuild (按交易日快速路径不回看)
+LOOKBACK_DAYS = 3
+# 逐标的写入按累计行数/时长分批提交 (整表一个事务在全量回填时会让 WAL 膨胀到数 GB)
+COMMIT_ROWS = 50_000
+COMMIT_SECONDS = 30.0
+# 沪深市场接口: 逐日请求 (按交易日快速路径/日颗粒兜底) 时按上交所交易日历跳过节假日
+SSE_CALENDAR_APIS = {"daily", "adj_factor", "bak_daily", "fund_daily", "fund_adj", "index_daily"}
+# 交易所行情接口周末必无数据, 逐日请求只走工作日; 其余接口 (外汇 fx_daily、全球指数等) 按自然日
+WEEKDAY_APIS = SSE_CALENDAR_APIS | {"hk_daily", "hk_daily_adj"}
 
 # ───────────────────────────────────────────── 目标表配置 (平铺) ──
 # key = 目标表名 (亦作 CLI 指定名)
@@ -94,6 +128,7 @@ TABLE_CONFIG: Dict[str, Dict[str, Any]] = {
         # Skip pending/delisted products to avoid empty backfills.
         "require_list_status": ["L"],
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
     "adj_factor_etf": {  # ETF 复权因子 (代码池: etf_basic)
         "api_name": "fund_adj",
@@ -103,6 +138,7 @@ TABLE_CONFIG: Dict[str, Dict[str, Any]] = {
         "ts_code_suffix_whitelist": [".SZ", ".SH", ".BJ"],
         "require_list_status": ["L"],
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
         "write_mode": "upsert",
         "update_columns": ["adj_factor", "discount_rate"],
         # 新增字段回填：当表结构缺少这些列时，按“已有最早日期~today”回拉一次以补齐列
@@ -181,12 +217,14 @@ TABLE_CONFIG: Dict[str, Dict[str, Any]] = {
         ],
         "stock_table": "stock_basic_a",
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
     "adj_factor_a": {  # A 股复权因子
         "api_name": "adj_factor",
         "fields": ["ts_code", "trade_date", "adj_factor"],
         "stock_table": "stock_basic_a",
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
     "bak_daily_a": {  # A 股拓展
         "api_name": "bak_daily",
@@ -218,6 +256,7 @@ TABLE_CONFIG: Dict[str, Dict[str, Any]] = {
         ],
         "stock_table": "stock_basic_a",
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
     "daily_h": {  # 港股日线
         "api_name": "hk_daily",
@@ -236,12 +275,14 @@ TABLE_CONFIG: Dict[str, Dict[str, Any]] = {
         ],
         "stock_table": "stock_basic_h",
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
     "adj_factor_h": {  # 港股复权因子
         "api_name": "hk_daily_adj",
         "fields": ["ts_code", "trade_date", "adj_factor"],
         "stock_table": "stock_basic_h",
         "limit": 6000,
+        "by_trade_date": True,  # 接口支持仅按 trade_date 拉全市场
     },
 }
 
@@ -255,11 +296,23 @@ if not logging.getLogger().handlers:
     )
 logger = logging.getLogger(__name__)
 
+_SSE_OPEN_DAYS: Optional[set[str]] = None
+_SSE_CAL_FAILED = False  # trade_cal 已失败过: 本进程不再重试, 按工作日处理
+# 只让一个线程发 trade_cal 请求, 其余线程等它的结果 (而不是各自重复请求)
+_SSE_CAL_LOCK = threading.Lock()
+_LIMITER = RateLimiter(CALLS_PER_MIN, 60.0)
+# SQLite 同一时刻只有一个写事务: 多表并发时写入在进程内排队, 避免 database is locked
+_WRITE_LOCK = threading.Lock()
+
 # ───────────────────────────────────────────── SQLite 工具 ──
 
 
 def _connect() -> sqlite3.Connection:
+    # connect_sqlite 已设置 WAL / synchronous=NORMAL / cache_size / mmap_size
     con = connect_sqlite(SQLITE_PATH)
+    con.execute("PRAGMA temp_store=MEMORY")
+    # 多表并发时各连接 (及同时运行的其它脚本) 争用写锁: 等待而非立即报 database is locked
+    con.execute("PRAGMA busy_timeout=5000")
     con.execute(
         """
         CREATE TABLE IF NOT EXISTS sync_date (
@@ -270,9 +323,27 @@ def _connect() -> sqlite3.Connection:
         )
         """
     )
+    # 按 (表, 日期) 直接取“今日已同步”的代码, 不必扫描该表全部 sync_date 行
+    con.execute(
+        "CREATE INDEX IF NOT EXISTS sync_date_table_last "
+        "ON sync_date (table_name, last_update_date)"
+    )
     return con
 
 
+@contextmanager
+def _write_txn(con: sqlite3.Connection) -> Iterator[None]:
+    """持全局写锁执行一个事务; 异常时回滚并继续抛出。"""
+    with _WRITE_LOCK:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        con.execute("COMMIT")
+
+
 def _table_exists(con: sqlite3.Connection, table: str) -> bool:
     return table_exists(con, table)
 
@@ -282,20 +353,47 @@ def _get_table_columns(con: sqlite3.Connection, table: str) -> List[str]:
     return [r[1] for r in rows]  # (cid, name, type, notnull, dflt_value, pk)
 
 
+# 目标表列集合缓存: 每表同步开始时清空, 建表/ALTER 时同步更新, SAVEPOINT 回滚时丢弃
+_COLS_CACHE: Dict[str, set[str]] = {}
+
+
+def _table_columns(con: sqlite3.Connection, table: str) -> set[str]:
+    """缓存版列集合; 表不存在时返回空集 (不缓存)。"""
+    cols = _COLS_CACHE.get(table)
+    if cols is None:
+        cols = set(_get_table_columns(con, table))
+        if cols:
+            _COLS_CACHE[table] = cols
+    return cols
+
+
+def _has_unique_index(con: sqlite3.Connection, table: str, column: str) -> bool:
+    """table 上是否存在仅含 column 的 (非部分) 唯一索引。"""
+    for _seq, name, unique, _origin, partial in con.execute(
+        f'PRAGMA index_list("{table}")'
+    ).fetchall():
+        if not unique or partial:
+            continue
+        info = con.execute(f'PRAGMA index_info("{name}")').fetchall()
+        if [r[2] for r in info] == [column]:
+            return True
+    return False
+
+
+# dtype.kind -> SQLite 列类型 (bool/有符号/无符号整数/浮点); 其余 (object/str/日期等) 为 TEXT
+_SQLITE_TYPE_BY_KIND = {"b": "INTEGER", "i": "INTEGER", "u": "INTEGER", "f": "REAL"}
+
+
 def _sqlite_type_for_series(s: "pd.Series") -> str:
-    if pd.api.types.is_bool_dtype(s):
-        return "INTEGER"
-    if pd.api.types.is_integer_dtype(s):
-        return "INTEGER"
-    if pd.api.types.is_float_dtype(s):
-        return "REAL"
-    return "TEXT"
+    return _SQLITE_TYPE_BY_KIND.get(s.dtype.kind, "TEXT")
 
 
 def _ensure_table_has_columns(con: sqlite3.Connection, table: str, df: pd.DataFrame) -> None:
-    if df.empty or not _table_exists(con, table):
+    if df.empty:
+        return
+    existing = _table_columns(con, table)
+    if not existing or existing.issuperset(df.columns):
         return
-    existing = set(_get_table_columns(con, table))
     for col in df.columns:
         if col in existing:
             continue
@@ -304,49 +402,59 @@ def _ensure_table_has_columns(con: sqlite3.Connection, table: str, df: pd.DataFr
         existing.add(col)
 
 
-def _get_latest_date(
-    con: sqlite3.Connection, table: str, ts_code: str
-) -> Optional[str]:
-    if not _table_exists(con, table):
-        return None
-    row = con.execute(
-        f"SELECT MAX(trade_date) FROM {table} WHERE ts_code=?", [ts_code]
-    ).fetchone()
-    return row[0] if row else None
+def _load_date_bounds(
+    con: sqlite3.Connection, table: str, ts_codes: List[str]
+) -> Dict[str, tuple[Optional[str], Optional[str]]]:
+    """一次查询取各 ts_code 的 (最早, 最新) trade_date。
+
+    不用 GROUP BY (需扫描整张索引): 对每个代码做相关子查询, 按 ORDER BY ... LIMIT 1
+    在 (ts_code, trade_date) 唯一索引上各定位一次 (覆盖索引, 不读表行, 也不走聚合),
+    代码列表经 json_each 传入。
+    """
+    if not ts_codes or not _table_exists(con, table):
+        return {}
+    rows = con.execute(
+        f"""
+        SELECT j.value,
+               (SELECT trade_date FROM "{table}" WHERE ts_code = j.value
+                ORDER BY trade_date LIMIT 1),
+               (SELECT trade_date FROM "{table}" WHERE ts_code = j.value
+                ORDER BY trade_date DESC LIMIT 1)
+        FROM json_each(?) AS j
+        """,
+        [json.dumps(ts_codes)],
+    ).fetchall()
+    return {code: (lo, hi) for code, lo, hi in rows if hi is not None}
 
 
-def _get_earliest_date(
-    con: sqlite3.Connection, table: str, ts_code: str
-) -> Optional[str]:
-    if not _table_exists(con, table):
-        return None
-    row = con.execute(
-        f"SELECT MIN(trade_date) FROM {table} WHERE ts_code=?", [ts_code]
-    ).fetchone()
-    return row[0] if row else None
+def _load_synced_codes(con: sqlite3.Connection, table: str, day: str) -> set[str]:
+    rows = con.execute(
+        "SELECT ts_code FROM sync_date WHERE table_name=? AND last_update_date=?",
+        [table, day],
+    ).fetchall()
+    return {r[0] for r in rows}
 
 
-def _get_last_sync(
-    con: sqlite3.Connection, table: str, ts_code: str
-) -> Optional[str]:
-    row = con.execute(
-        "SELECT last_update_date FROM sync_date WHERE table_name=? AND ts_code=?",
-        [table, ts_code],
-    ).fetchone()
-    return row[0] if row else None
+def _load_last_sync(con: sqlite3.Connection, table: str) -> Dict[str, str]:
+    rows = con.execute(
+        "SELECT ts_code, last_update_date FROM sync_date WHERE table_name=?",
+        [table],
+    ).fetchall()
+    return dict(rows)
 
 
 def _set_last_sync(
-    con: sqlite3.Connection, table: str, ts_code: str, date_str: str
+    con: sqlite3.Connection, table: str, ts_codes: Iterable[str], date_str: str
 ) -> None:
-    con.execute(
+    """批量标记 sync_date (一次 executemany, 由调用方在整表结束时统一写入)。"""
+    con.executemany(
         """
         INSERT INTO sync_date (table_name, ts_code, last_update_date)
         VALUES (?, ?, ?)
         ON CONFLICT (table_name, ts_code)
         DO UPDATE SET last_update_date = EXCLUDED.last_update_date
         """,
-        [table, ts_code, date_str],
+        [(table, ts_code, date_str) for ts_code in ts_codes],
     )
 
 
@@ -359,15 +467,17 @@ def _upsert(
     *,
     write_mode: str = "ignore",
     update_columns: Optional[List[str]] = None,
-) -> None:
-    """将单只股票(或若干)的增量数据写入.
+    index_ready: bool = False,
+) -> int:
+    """将单只股票(或若干)的增量数据写入, 返回写入行数.
     context_ts/context_name 仅用于日志增强, 不参与逻辑.
+    index_ready=True 表示调用方已确保 (ts_code, trade_date) 唯一索引存在.
     """
     if df.empty:
         logger.debug(
             "[跳过] %s %s %s 空数据", table, context_ts or "", context_name or ""
         )
-        return
+        return 0
     tag = f"{context_ts or ''} {context_name or ''}".strip()
 
     if write_mode not in {"ignore", "upsert"}:
@@ -390,18 +500,18 @@ def _upsert(
             f'INSERT INTO "{table}" ({quoted_cols}) VALUES ({placeholders}) '
             f'ON CONFLICT("ts_code","trade_date") DO UPDATE SET {set_sql}'
         )
-        work = df.copy()
-        work = work.drop_duplicates(subset=conflict_cols)
-        before = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
-        records = (
-            work.where(pd.notnull(work), None).to_records(index=False).tolist()
-        )
-        con.executemany(sql, records)
-        after = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
-        return int(after - before)
-
-    if not _table_exists(con, table):
-        df.head(0).to_sql(table, con, if_exists="fail", index=False)
+        # 直接由列生成记录 (df_to_records), 不复制整表; 仅在确有重复键时才过滤出副本
+        dup = df.duplicated(subset=conflict_cols)
+        work = df[~dup.to_numpy()] if dup.any() else df
+        # total_changes 差值 = 插入 + 更新行数 (O(1)); 不再两次全表 COUNT(*)
+        before = con.total_changes
+        con.executemany(sql, df_to_records(work))
+        return con.total_changes - before
+
+    if not _table_columns(con, table):
+        # 不用 to_sql: 它会自行 COMMIT, 打断外层事务与 SAVEPOINT
+        con.execute(pd.io.sql.get_schema(df.head(0), table, con=con))
+        _COLS_CACHE[table] = set(df.columns)
         if "ts_code" in df.columns and "trade_date" in df.columns:
             ensure_unique_index(
                 con,
@@ -423,7 +533,7 @@ def _upsert(
         )
         logger.info("[新建] %-14s %-22s 写入 %6d 行", table, tag, inserted)
     else:
-        if "ts_code" in df.columns and "trade_date" in df.columns:
+        if not index_ready and "ts_code" in df.columns and "trade_date" in df.columns:
             ensure_unique_index(
                 con,
                 table=table,
@@ -443,23 +553,82 @@ def _upsert(
             )
         )
         logger.info(
-            "[追加] %-14s %-22s 新增 %6d 行 (请求 %d)",
+            "[追加] %-14s %-22s %s %6d 行 (请求 %d)",
             table,
             tag,
+            "新增" if write_mode == "ignore" else "写入",  # upsert 模式含更新行
             inserted,
             len(df),
         )
+    return inserted
 
 
 # ───────────────────────────────────────────── Tushare 抓取 ──
 
 
+def _retry_delay(base: float, attempt: int) -> float:
+    """指数退避 + 抖动: 并发线程同时失败时不会在同一时刻重试。"""
+    return base * 2 ** (attempt - 1) + random.uniform(0, base)
+
+
 def _fetch_page(
     pro: ts.pro_api, api_name: str, params: Dict[str, Any], fields: List[str]
 ) -> pd.DataFrame:
     return getattr(pro, api_name)(**params, fields=",".join(fields))
 
 
+def _sse_open_days(pro: ts.pro_api) -> Optional[set[str]]:
+    """上交所交易日 (START_DATE~今天), 进程内只拉一次; 失败返回 None (失败也只尝试一次)。"""
+    global _SSE_OPEN_DAYS, _SSE_CAL_FAILED
+    with _SSE_CAL_LOCK:
+        if _SSE_OPEN_DAYS is None and not _SSE_CAL_FAILED:
+            _LIMITER.acquire()
+            try:
+                cal = pro.trade_cal(
+                    exchange="SSE",
+                    is_open="1",
+                    start_date=START_DATE,
+                    end_date=datetime.now().strftime("%Y%m%d"),
+                    fields="cal_date",
+                )
+            except Exception as exc:
+                logger.warning("trade_cal 获取失败, 本次运行按工作日逐日: %s", exc)
+                _SSE_CAL_FAILED = True
+                return None
+            _SSE_OPEN_DAYS = set(cal["cal_date"].astype(str))
+        return _SSE_OPEN_DAYS
+
+
+def _trade_days(pro: ts.pro_api, api_name: str, start: str, end: str) -> List[str]:
+    """start~end 间可能有数据的日期: 交易所接口跳过周末, 沪深接口再按交易日历剔除节假日;
+    其余接口 (外汇等) 逐个自然日。"""
+    if api_name not in WEEKDAY_APIS:
+        return [d.strftime("%Y%m%d") for d in pd.date_range(start, end)]
+    days = [d.strftime("%Y%m%d") for d in pd.bdate_range(start, end)]
+    if api_name in SSE_CALENDAR_APIS:
+        open_days = _sse_open_days(pro)
+        if open_days:
+            # 日历只覆盖 START_DATE 之后, 更早的日期仍按工作日处理
+            days = [d for d in days if d < START_DATE or d in open_days]
+    return days
+
+
+def _lookback_start(pro: ts.pro_api, api_name: str, latest: pd.Series) -> pd.Series:
+    """各标的回看起点: latest 往前数 LOOKBACK_DAYS-1 个交易日 (跨周末/节假日); 无存量或非 YYYYMMDD 时为 None。"""
+    out = pd.Series([None] * len(latest), index=latest.index, dtype=object)
+    raw = latest[latest.notna()].astype(str)
+    raw = raw[raw.str.fullmatch(r"\d{8}")]
+    if raw.empty:
+        return out
+    # 一次取最早 latest (留足节假日余量) ~ 最晚 latest 的全部候选日期, 再按位置回退
+    days = pd.Index(_trade_days(pro, api_name, _add_days(raw.min(), -(LOOKBACK_DAYS + 21)), raw.max()))
+    if days.empty:
+        return out
+    pos = days.searchsorted(raw.to_numpy(), side="right") - LOOKBACK_DAYS
+    out[raw.index] = days[pos.clip(0)].to_numpy()
+    return out
+
+
 def _fetch_api_with_paging(
     pro: ts.pro_api,
     api_name: str,
@@ -469,19 +638,26 @@ def _fetch_api_with_paging(
     limit: int,
     sleep: float,
     sleep_on_fail: float,
+    strict: bool = False,
 ) -> pd.DataFrame:
-    """分页 + 重试 + pandas is_unique 兜底(日颗粒)。支持 per-table limit/sleep。"""
+    """分页 + 重试 + pandas is_unique 兜底(日颗粒)。支持 per-table limit/sleep。
+
+    strict=True 时不走日颗粒兜底 (兜底会吞掉单日失败, 返回缺日的结果):
+    首页失败直接抛 RuntimeError, 由调用方整体回退。
+    """
     page_limit = min(int(limit), TS_API_MAX_PAGE_SIZE)
+    fields_csv = ",".join(fields)  # 每页/每日复用, 不在循环内重复拼接
     offset, chunks = 0, []
     while True:
         df_chunk = None
         for attempt in range(1, MAX_RETRY + 1):
+            _LIMITER.acquire()
             try:
                 df_chunk = getattr(pro, api_name)(
                     **params,
                     offset=offset,
                     limit=page_limit,
-                    fields=",".join(fields),
+                    fields=fields_csv,
                 )
                 break
             except AttributeError as exc:
@@ -503,7 +679,7 @@ def _fetch_api_with_paging(
                     MAX_RETRY,
                     exc,
                 )
-                time.sleep(sleep_on_fail)
+                time.sleep(_retry_delay(sleep_on_fail, attempt))
             except Exception as exc:
                 logger.warning(
                     "%s 调用失败 offset=%s attempt=%s/%s: %s",
@@ -513,16 +689,22 @@ def _fetch_api_with_paging(
                     MAX_RETRY,
                     exc,
                 )
-                time.sleep(sleep_on_fail)
+                time.sleep(_retry_delay(sleep_on_fail, attempt))
         if df_chunk is None and chunks == [] and offset == 0:
+            if strict:
+                raise RuntimeError(f"{api_name} 请求失败 params={params}")
             break
         if df_chunk is None:
             raise RuntimeError(f"{api_name} 连续 {MAX_RETRY} 次失败")
-        chunks.append(df_chunk)
         if len(df_chunk) < page_limit:
-            return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            if not chunks:  # 增量常见情形: 首页即末页, 直接返回, 不经 concat 复制
+                return df_chunk
+            chunks.append(df_chunk)
+            return pd.concat(chunks, ignore_index=True)
+        chunks.append(df_chunk)
         offset += page_limit
-        time.sleep(sleep)
+        if sleep:
+            time.sleep(sleep)
 
     # 第二阶段: 日颗粒兜底
     start_str = params.get("start_date") or params.get("trade_date") or START_DATE
@@ -531,24 +713,22 @@ def _fetch_api_with_paging(
         or params.get("trade_date")
         or datetime.now().strftime("%Y%m%d")
     )
-    start_dt = pd.to_datetime(start_str)
-    end_dt = pd.to_datetime(end_str)
-    daily_chunks: List[pd.DataFrame] = []
-    for date in pd.date_range(start_dt, end_dt):
-        day_params = params.copy()
-        day_params.pop("start_date", None)
-        day_params.pop("end_date", None)
-        day_params["trade_date"] = date.strftime("%Y%m%d")
+    base_day_params = {
+        k: v for k, v in params.items() if k not in ("start_date", "end_date")
+    }
+
+    def _one_day(trade_date: str) -> Optional[pd.DataFrame]:
+        day_params = {**base_day_params, "trade_date": trade_date}
+        df_day = None
         for attempt in range(1, MAX_RETRY + 1):
+            _LIMITER.acquire()
             try:
                 df_day = getattr(pro, api_name)(
                     **day_params,
                     offset=0,
                     limit=page_limit,
-                    fields=",".join(fields),
+                    fields=fields_csv,
                 )
-                if not df_day.empty:
-                    daily_chunks.append(df_day)
                 break
             except Exception as exc:
                 if attempt == MAX_RETRY:
@@ -559,13 +739,55 @@ def _fetch_api_with_paging(
                         params.get("ts_code"),
                         exc,
                     )
-                time.sleep(sleep_on_fail)
-        time.sleep(sleep)
+                    return None
+                time.sleep(_retry_delay(sleep_on_fail, attempt))
+        if sleep:
+            time.sleep(sleep)
+        return df_day
+
+    # 逐日串行: 调用方已在抓取线程池内 (每表 FETCH_WORKERS 并发), 再开一层线程池
+    # 只会让线程数/并发连接数成倍放大, 超出共享 Session 的连接池
+    days = [_one_day(d) for d in _trade_days(pro, api_name, start_str, end_str)]
+    daily_chunks = [d for d in days if d is not None and not d.empty]
     return (
         pd.concat(daily_chunks, ignore_index=True) if daily_chunks else pd.DataFrame()
     )
 
 
+def _fetch_by_trade_date(
+    pro: ts.pro_api,
+    api_name: str,
+    fields: List[str],
+    trade_dates: List[str],
+    *,
+    limit: int,
+    sleep: float,
+    sleep_on_fail: float,
+) -> Optional[pd.DataFrame]:
+    """逐交易日拉取全市场数据 (并发); 任一日失败返回 None, 由调用方回退逐标的路径。"""
+
+    def _one_day(trade_date: str) -> pd.DataFrame:
+        return _fetch_api_with_paging(
+            pro,
+            api_name,
+            {"trade_date": trade_date},
+            fields,
+            limit=limit,
+            sleep=sleep,
+            sleep_on_fail=sleep_on_fail,
+            strict=True,
+        )
+
+    try:
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            frames = list(pool.map(_one_day, trade_dates))
+    except Exception as exc:
+        logger.warning("%s 按交易日拉取失败, 回退逐标的: %s", api_name, exc)
+        return None
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=fields)
+
+
 # ───────────────────────────────────────────── 核心同步逻辑 ──
 
 
@@ -580,23 +802,40 @@ def _iter_tables(selected: Optional[Iterable[str]]) -> Iterable[str]:
         yield name
 
 
-def _normalize_yyyymmdd(value: object | None) -> str | None:
-    if value is None:
-        return None
-    s = str(value).strip()
-    if not s:
-        return None
-    if len(s) != 8 or not s.isdigit():
-        return None
-    return s
+def _parse_yyyymmdd(value: str) -> datetime:
+    # 直接切片构造, 比 pd.to_datetime 单值解析快一个数量级
+    s = str(value)
+    if len(s) == 8 and s.isdigit():
+        return datetime(int(s[:4]), int(s[4:6]), int(s[6:8]))
+    return pd.to_datetime(s).to_pydatetime()  # 兼容非 YYYYMMDD 的存量值
 
 
-def _max_yyyymmdd(a: str | None, b: str | None) -> str | None:
-    if a is None:
-        return b
-    if b is None:
-        return a
-    return a if a >= b else b
+def _add_days(value: str, days: int) -> str:
+    return (_parse_yyyymmdd(value) + timedelta(days=days)).strftime("%Y%m%d")
+
+
+def _yyyymmdd_or_none(col: Optional[pd.Series], n: int) -> pd.Series:
+    """规范化 YYYYMMDD 列: 非 8 位数字 (含缺失/缺列) 置 None, object dtype。"""
+    if col is None:
+        return pd.Series([None] * n, dtype=object)
+    s = col.reset_index(drop=True).astype(str).str.strip()
+    s = s.where(s.str.fullmatch(r"\d{8}"))
+    return s.astype(object).where(s.notna(), None)
+
+
+def _shift_days(values: pd.Series, days: int) -> pd.Series:
+    """整列版 _add_days; None 保持 None。"""
+    out = pd.Series([None] * len(values), index=values.index, dtype=object)
+    present = values.notna()
+    if present.any():
+        raw = values[present].astype(str)
+        dt = pd.to_datetime(raw, format="%Y%m%d", errors="coerce")
+        shifted = (dt + pd.Timedelta(days=days)).dt.strftime("%Y%m%d").astype(object)
+        odd = dt.isna()
+        if odd.any():  # 兼容非 YYYYMMDD 的存量值
+            shifted[odd] = [_add_days(v, days) for v in raw[odd]]
+        out[present] = shifted
+    return out
 
 
 def _sync_one_table(
@@ -614,7 +853,7 @@ def _sync_one_table(
     # 读取该表特定 limit/sleep
     limit = int(cfg.get("limit", DEFAULT_LIMIT))
     sleep = float(cfg.get("sleep", DEFAULT_SLEEP))
-    sleep_on_fail = float(cfg.get("sleep_on_fail", cfg.get("sleep", DEFAULT_SLEEP) * 2))
+    sleep_on_fail = float(cfg.get("sleep_on_fail", DEFAULT_SLEEP_ON_FAIL))
     # -------- 通用获取代码集合逻辑 --------
     explicit_codes: Optional[List[str]] = None
     if "ts_codes" in cfg and cfg["ts_codes"]:
@@ -633,9 +872,6 @@ def _sync_one_table(
         code_column = str(cfg.get("code_column") or "ts_code").strip()
         preferred_name_col = str(cfg.get("name_column") or "").strip() or None
         cols = set(_get_table_columns(con, stock_table))
-        has_list_date = "list_date" in cols
-        has_setup_date = "setup_date" in cols
-        has_list_status = "list_status" in cols
         if code_column not in cols:
             raise RuntimeError(
                 f"{table_key} 需要代码列 {stock_table}.{code_column}, "
@@ -649,216 +885,392 @@ def _sync_one_table(
                 if c in cols:
                     name_col = c
                     break
-        date_select_parts: list[str] = []
-        if has_list_date:
-            date_select_parts.append('MIN("list_date") AS list_date')
-        if has_setup_date:
-            date_select_parts.append('MIN("setup_date") AS setup_date')
-        if has_list_status:
-            date_select_parts.append('MIN("list_status") AS list_status')
-        date_select = (", " + ", ".join(date_select_parts)) if date_select_parts else ""
-        if code_column == "ts_code":
-            if name_col:
-                stock_df = pd.read_sql_query(
-                    f"""
-                    SELECT ts_code, MIN("{name_col}") AS name{date_select}
-                    FROM "{stock_table}"
-                    WHERE ts_code IS NOT NULL AND TRIM(ts_code) <> ''
-                    GROUP BY ts_code
-                    """,
-                    con,
-                )
-            else:
-                stock_df = pd.read_sql_query(
-                    f"""
-                    SELECT ts_code, MIN(ts_code) AS name{date_select}
-                    FROM "{stock_table}"
-                    WHERE ts_code IS NOT NULL AND TRIM(ts_code) <> ''
-                    GROUP BY ts_code
-                    """,
-                    con,
-                )
+        code_expr = f'"{code_column}"'
+        name_expr = f'"{name_col}"' if name_col else code_expr
+        extra_cols = [c for c in ("list_date", "setup_date", "list_status") if c in cols]
+        if _has_unique_index(con, stock_table, code_column):
+            # 代码列已唯一 (基础表的 ts_code 唯一索引): 无需 GROUP BY 聚合, 按索引顺序读取
+            select_parts = [f"{name_expr} AS name"] + [f'"{c}" AS {c}' for c in extra_cols]
+            tail = f"ORDER BY {code_expr}"
         else:
-            if name_col:
-                stock_df = pd.read_sql_query(
-                    f"""
-                    SELECT "{code_column}" AS ts_code, MIN("{name_col}") AS name{date_select}
-                    FROM "{stock_table}"
-                    WHERE "{code_column}" IS NOT NULL AND TRIM("{code_column}") <> ''
-                    GROUP BY "{code_column}"
-                    """,
-                    con,
-                )
-            else:
-                stock_df = pd.read_sql_query(
-                    f"""
-                    SELECT "{code_column}" AS ts_code, MIN("{code_column}") AS name{date_select}
-                    FROM "{stock_table}"
-                    WHERE "{code_column}" IS NOT NULL AND TRIM("{code_column}") <> ''
-                    GROUP BY "{code_column}"
-                    """,
-                    con,
-                )
+            select_parts = [f"MIN({name_expr}) AS name"] + [
+                f'MIN("{c}") AS {c}' for c in extra_cols
+            ]
+            tail = f"GROUP BY {code_expr}"
+        # 后缀白名单 / 上市状态在 SQL 中过滤, 不再读出后用 pandas 逐行筛
+        where = [f"{code_expr} IS NOT NULL", f"TRIM({code_expr}) <> ''"]
+        params: List[str] = []
+        suffix_whitelist = cfg.get("ts_code_suffix_whitelist")
+        if suffix_whitelist:
+            # GLOB 区分大小写, 与 str.endswith 一致
+            where.append(
+                "(" + " OR ".join([f"{code_expr} GLOB ?"] * len(suffix_whitelist)) + ")"
+            )
+            params.extend(f"*{s}" for s in suffix_whitelist)
+        require_list_status = cfg.get("require_list_status")
+        if require_list_status and "list_status" in cols:
+            where.append(f'"list_status" IN ({", ".join(["?"] * len(require_list_status))})')
+            params.extend(str(s) for s in require_list_status)
+        stock_df = pd.read_sql_query(
+            f"""
+            SELECT {code_expr} AS ts_code, {", ".join(select_parts)}
+            FROM "{stock_table}"
+            WHERE {" AND ".join(where)}
+            {tail}
+            """,
+            con,
+            params=params,
+        )
         stock_df = stock_df.dropna(subset=["ts_code"])
         stock_df = stock_df[stock_df.ts_code.astype(str).str.strip() != ""]
         if table_key == "fx_daily" and RUNTIME_FX_CODES is not None:
             stock_df = stock_df[stock_df.ts_code.isin(RUNTIME_FX_CODES)]
 
-    suffix_whitelist = cfg.get("ts_code_suffix_whitelist")
-    if suffix_whitelist:
-        suffixes = tuple(str(s) for s in suffix_whitelist)
-        stock_df = stock_df[stock_df.ts_code.astype(str).str.endswith(suffixes)]
-
-    require_list_status = cfg.get("require_list_status")
-    if require_list_status and "list_status" in stock_df.columns:
-        allowed = {str(s) for s in require_list_status}
-        stock_df = stock_df[stock_df["list_status"].astype(str).isin(allowed)]
     if ts_codes_filter:
         stock_df = stock_df[stock_df.ts_code.isin(ts_codes_filter)]
-    total = len(stock_df)
-    logger.info("[%s] 股票数=%d limit=%d sleep=%.4f", target_table, total, limit, sleep)
-    processed = 0
+    logger.info(
+        "[%s] 股票数=%d limit=%d sleep=%.4f workers=%d",
+        target_table,
+        len(stock_df),
+        limit,
+        sleep,
+        FETCH_WORKERS,
+    )
+    _COLS_CACHE.pop(target_table, None)  # 表结构可能已被外部修改: 每表开始时重读一次
+    target_cols = _table_columns(con, target_table)
     backfill_cols = list(cfg.get("backfill_if_missing_columns") or [])
-    force_backfill = False
-    if backfill_cols and _table_exists(con, target_table):
-        existing_cols = set(_get_table_columns(con, target_table))
-        force_backfill = any(c not in existing_cols for c in backfill_cols)
-    con.execute("BEGIN")
-    for row in stock_df.itertuples(index=False):
-        ts_code: str = row.ts_code
+    force_backfill = bool(target_cols) and any(c not in target_cols for c in backfill_cols)
+    write_mode = str(cfg.get("write_mode") or "ignore")
+    update_columns = list(cfg.get("update_columns") or []) or None
+    # 唯一索引每表只确保一次; 表尚不存在时由首次 _upsert 建表并建索引
+    index_ready = False
+    if {"ts_code", "trade_date"} <= target_cols:
         try:
-            row_list_date = _normalize_yyyymmdd(getattr(row, "list_date", None))
-            row_setup_date = _normalize_yyyymmdd(getattr(row, "setup_date", None))
-            row_min_date = row_list_date or row_setup_date
-            # Prefer per-symbol listing date (avoid wasting calls before listing).
-            desired_min_date = _max_yyyymmdd(START_DATE, row_min_date)
-            if rebuild:
-                con.execute(f'DELETE FROM "{target_table}" WHERE ts_code=?', [ts_code])
-                con.execute(
-                    "DELETE FROM sync_date WHERE table_name=? AND ts_code=?",
-                    [target_table, ts_code],
+            with _write_txn(con):
+                # 存量表若有重复键则先去重再建 (同 db_dedupe), 否则 CREATE UNIQUE INDEX 失败
+                ensure_unique_index_with_dedupe(
+                    con,
+                    table=target_table,
+                    columns=["ts_code", "trade_date"],
+                    index_name=f"{target_table}_uq",
                 )
-            last_sync = _get_last_sync(con, target_table, ts_code)
-            earliest = _get_earliest_date(con, target_table, ts_code)
-            want_backfill = (
-                backfill_history
-                and not rebuild
-                and desired_min_date is not None
-                and earliest is not None
-                and desired_min_date < str(earliest)
-            )
-            if (
-                last_sync == today
-                and not force_backfill
-                and not rebuild
-                and not want_backfill
-            ):
-                continue
-            latest = _get_latest_date(con, target_table, ts_code)
-            start_date = (
-                (pd.to_datetime(latest) + timedelta(days=1)).strftime("%Y%m%d")
-                if latest
-                else (desired_min_date or START_DATE)
+            index_ready = True
+        except sqlite3.Error as exc:
+            # 不中断整个 sync: 索引留待各次写入时再尝试
+            logger.warning("[%s] 唯一索引创建失败: %s", target_table, exc)
+
+    def _rebuild_delete(ts_code: str) -> None:
+        con.execute(f'DELETE FROM "{target_table}" WHERE ts_code=?', [ts_code])
+        con.execute(
+            "DELETE FROM sync_date WHERE table_name=? AND ts_code=?",
+            [target_table, ts_code],
+        )
+
+    universe_size = len(stock_df)
+    # -------- 规划: 逐标的计算抓取区间 (仅读库, 不持写锁) --------
+    # sync_date 与各代码已有日期区间整表各取一次, 循环内只查字典
+    # rebuild: 旧数据将在写入前删除, 规划时按“无数据、未同步”处理
+    if rebuild or force_backfill or backfill_history:
+        last_sync_of = {} if rebuild else _load_last_sync(con, target_table)
+    else:
+        # 常规增量: 先剔除今日已同步的代码, 同日重跑时只剩残差 (通常为空)
+        done_today = _load_synced_codes(con, target_table, today)
+        if done_today:
+            stock_df = stock_df[~stock_df["ts_code"].isin(done_today)]
+        last_sync_of = {}
+        if stock_df.empty:
+            logger.info("[%s] 今日已全部同步 (%d 只)", target_table, universe_size)
+            return
+    bounds_of = (
+        {}
+        if rebuild
+        else _load_date_bounds(con, target_table, [str(c) for c in stock_df["ts_code"]])
+    )
+    # 最近一个可能有数据的日期 (周末/沪深节假日除外): 区间全落在其后则无需请求
+    recent_days = _trade_days(pro, str(cfg["api_name"]), _add_days(today, -14), today)
+    last_open = recent_days[-1] if recent_days else None
+    # 各标的的日期与分支条件整列计算, 之后只按掩码取行
+    plan = pd.DataFrame(
+        {"ts_code": stock_df["ts_code"].to_numpy(), "name": stock_df["name"].to_numpy()}
+    )
+    codes = plan["ts_code"]
+    # Prefer per-symbol listing date (avoid wasting calls before listing).
+    row_min = _yyyymmdd_or_none(stock_df.get("list_date"), len(plan))
+    row_min = row_min.where(row_min.notna(), _yyyymmdd_or_none(stock_df.get("setup_date"), len(plan)))
+    desired_min = row_min.where(row_min > START_DATE, START_DATE)
+    earliest = codes.map(lambda c: bounds_of.get(c, (None, None))[0])
+    latest = codes.map(lambda c: bounds_of.get(c, (None, None))[1])
+    has_earliest = earliest.notna()
+    want_backfill = (
+        pd.Series(backfill_history and not rebuild, index=plan.index)
+        & has_earliest
+        & (desired_min < earliest)
+    )
+    skip = (codes.map(last_sync_of) == today) & ~want_backfill
+    if force_backfill or rebuild:
+        skip[:] = False
+    start_date = _shift_days(latest, 1).where(latest.notna(), desired_min)
+    # 新增字段回填：如果目标表缺列，回拉“已有最早日期~today”补齐
+    if force_backfill:
+        start_date = earliest.where(has_earliest, desired_min)
+    # 逐标的请求起点: 有存量时往前回看 LOOKBACK_DAYS 个交易日; 是否请求/标记仍按 start_date 判断
+    fetch_start = start_date
+    if not force_backfill:
+        lookback = _lookback_start(pro, str(cfg["api_name"]), latest)
+        fetch_start = lookback.where(lookback.notna(), start_date)
+    beyond_today = start_date > today
+    # 今天休市: 接口必然返回空, 不发请求直接标记 (交易日的空结果仍不标记, 允许当日重跑补抓)
+    closed = (
+        ~want_backfill & (start_date > last_open)
+        if last_open is not None and not rebuild
+        else pd.Series(False, index=plan.index)
+    )
+    mark_only = ~skip & (beyond_today | closed)
+    # rebuild 且无需抓取的代码: 旧数据在逐标的写入事务开头删除
+    rebuild_only = codes[mark_only & beyond_today].tolist() if rebuild else []
+    # 历史补齐：若本地最早 trade_date 晚于 desired_min，则回拉缺失区间
+    # (增量区间总在 earliest 之后, 故补齐区间可在抓取前确定)
+    backfill_end = _shift_days(earliest.where(want_backfill, None), -1)
+    backfill_end = backfill_end.where(desired_min <= backfill_end, None)
+
+    synced: List[str] = codes[mark_only].tolist()  # 待标记 sync_date=today, 整表结束时一次写入
+    todo = ~skip & ~mark_only
+    jobs: List[Dict[str, Any]] = [
+        {
+            "ts_code": ts_code,
+            "name": name,
+            "latest": lt,
+            "start_date": sd,
+            "fetch_start": fs,
+            "backfill_start": bs,
+            "backfill_end": be,
+        }
+        for ts_code, name, lt, sd, fs, bs, be in zip(
+            codes[todo],
+            plan["name"][todo],
+            latest[todo],
+            start_date[todo],
+            fetch_start[todo],
+            desired_min[todo],
+            backfill_end[todo],
+        )
+    ]
+
+    # -------- 快速路径: 窗口窄时按 trade_date 拉全市场 --------
+    # 只对起点落在最近 PIVOT_MAX_DAYS 天内的标的生效; 停牌/长期无数据的旧起点标的
+    # 不再拖累全表, 它们留给下面的逐标的路径
+    if jobs and cfg.get("by_trade_date") and not rebuild and not force_backfill:
+        cutoff = _add_days(today, -PIVOT_MAX_DAYS)
+        pivot_jobs = [
+            job for job in jobs if job["backfill_end"] is None and job["start_date"] >= cutoff
+        ]
+        trade_dates: List[str] = []
+        if pivot_jobs:
+            # 不回看: 日常增量每表每日仍只请求一次全市场
+            global_min = min(job["start_date"] for job in pivot_jobs)
+            trade_dates = _trade_days(pro, str(cfg["api_name"]), global_min, today)
+        if trade_dates and len(trade_dates) < len(pivot_jobs):
+            logger.info(
+                "[%s] 按交易日拉取 %s~%s (%d 日, %d 只; 其余 %d 只逐标的)",
+                target_table,
+                global_min,
+                today,
+                len(trade_dates),
+                len(pivot_jobs),
+                len(jobs) - len(pivot_jobs),
             )
-            # 新增字段回填：如果目标表缺列，回拉“已有最早日期~today”补齐
-            if force_backfill:
-                if earliest:
-                    start_date = earliest
-                else:
-                    start_date = desired_min_date or START_DATE
-            if start_date > today:
-                _set_last_sync(con, target_table, ts_code, today)
-                continue
-            params = {"ts_code": ts_code, "start_date": start_date, "end_date": today}
-            df = _fetch_api_with_paging(
+            df_all = _fetch_by_trade_date(
                 pro,
                 cfg["api_name"],
-                params,
                 cfg["fields"],
+                trade_dates,
                 limit=limit,
                 sleep=sleep,
                 sleep_on_fail=sleep_on_fail,
             )
-            wrote_new = False
-            if not df.empty:
-                df.sort_values("trade_date", inplace=True)
-                before_latest = latest
-                _upsert(
-                    con,
-                    df,
-                    target_table,
-                    context_ts=ts_code,
-                    context_name=getattr(row, "name", None),
-                    write_mode=str(cfg.get("write_mode") or "ignore"),
-                    update_columns=list(cfg.get("update_columns") or []) or None,
-                )
-                new_latest = _get_latest_date(con, target_table, ts_code)
-                wrote_new = new_latest != before_latest
-            else:
-                logger.debug(
-                    "[%s] %s 无数据返回 start=%s", target_table, ts_code, start_date
+            if df_all is not None:
+                start_of = {job["ts_code"]: job["start_date"] for job in pivot_jobs}
+                if not df_all.empty:
+                    starts = df_all["ts_code"].map(start_of)
+                    keep = starts.notna() & (
+                        df_all["trade_date"].astype(str) >= starts.fillna("99999999")
+                    )
+                    df_all = df_all[keep]
+                wrote = set(df_all["ts_code"]) if not df_all.empty else set()
+                # 与逐标的路径一致: 写入了新交易日, 或区间不止今天, 才标记已同步
+                synced.extend(
+                    job["ts_code"]
+                    for job in pivot_jobs
+                    if job["ts_code"] in wrote or job["start_date"] < today
                 )
-
-            # 历史补齐：若本地最早 trade_date 晚于 desired_min_date，则回拉缺失区间
-            if want_backfill and desired_min_date is not None:
-                earliest_now = _get_earliest_date(con, target_table, ts_code)
-                if earliest_now is not None and desired_min_date < str(earliest_now):
-                    backfill_end = (
-                        pd.to_datetime(str(earliest_now)) - timedelta(days=1)
-                    ).strftime("%Y%m%d")
-                    if desired_min_date <= backfill_end:
-                        logger.info(
-                            "[%s] %s backfill %s~%s",
-                            target_table,
-                            ts_code,
-                            desired_min_date,
-                            backfill_end,
-                        )
-                        backfill_params = {
-                            "ts_code": ts_code,
-                            "start_date": desired_min_date,
-                            "end_date": backfill_end,
-                        }
-                        df_old = _fetch_api_with_paging(
-                            pro,
-                            cfg["api_name"],
-                            backfill_params,
-                            cfg["fields"],
-                            limit=limit,
-                            sleep=sleep,
-                            sleep_on_fail=sleep_on_fail,
-                        )
-                        if not df_old.empty:
-                            df_old.sort_values("trade_date", inplace=True)
-                            _upsert(
-                                con,
-                                df_old,
-                                target_table,
-                                context_ts=ts_code,
-                                context_name=getattr(row, "name", None),
-                                write_mode=str(cfg.get("write_mode") or "ignore"),
-                                update_columns=list(cfg.get("update_columns") or []) or None,
-                            )
-            if wrote_new or start_date < today:
-                _set_last_sync(con, target_table, ts_code, today)
-        except Exception as exc:
-            logger.warning("[%s] %s 同步失败: %s", target_table, ts_code, exc, exc_info=True)
-            con.execute("ROLLBACK")
-            con.execute("BEGIN")
-        processed += 1
-        if processed % 10 == 0 or processed == total:
+                # 抓取已完成, 仅写库时持锁
+                with _write_txn(con):
+                    _upsert(
+                        con,
+                        df_all,
+                        target_table,
+                        context_ts=f"{len(pivot_jobs)}只",
+                        context_name=f"{global_min}~{today}",
+                        write_mode=write_mode,
+                        update_columns=update_columns,
+                        index_ready=index_ready,
+                    )
+                    _set_last_sync(con, target_table, synced, today)
+                if len(pivot_jobs) == len(jobs):
+                    return
+                synced = []  # 已随快速路径提交
+                index_ready = index_ready or not df_all.empty
+                pivoted = {job["ts_code"] for job in pivot_jobs}
+                jobs = [job for job in jobs if job["ts_code"] not in pivoted]
+
+    total = len(jobs)
+    if total < universe_size:
+        logger.info("[%s] 当日已同步/无需抓取 %d 只", target_table, universe_size - total)
+
+    def _fetch_job(job: Dict[str, Any]) -> tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+        params = {"ts_code": job["ts_code"], "start_date": job["fetch_start"], "end_date": today}
+        df = _fetch_api_with_paging(
+            pro,
+            cfg["api_name"],
+            params,
+            cfg["fields"],
+            limit=limit,
+            sleep=sleep,
+            sleep_on_fail=sleep_on_fail,
+        )
+        df_old = None
+        if job["backfill_end"] is not None:
             logger.info(
-                "[%s] 进度 %d/%d (%.1f%%)",
+                "[%s] %s backfill %s~%s",
                 target_table,
-                processed,
-                total,
-                processed / total * 100,
+                job["ts_code"],
+                job["backfill_start"],
+                job["backfill_end"],
+            )
+            backfill_params = {
+                "ts_code": job["ts_code"],
+                "start_date": job["backfill_start"],
+                "end_date": job["backfill_end"],
+            }
+            df_old = _fetch_api_with_paging(
+                pro,
+                cfg["api_name"],
+                backfill_params,
+                cfg["fields"],
+                limit=limit,
+                sleep=sleep,
+                sleep_on_fail=sleep_on_fail,
             )
-        time.sleep(sleep)
-        if processed % BATCH_SIZE == 0:
-            con.execute("COMMIT")
-            con.execute("BEGIN")
-    con.execute("COMMIT")
+        return df, df_old
+
+    def _write_batch(batch: List[tuple[Dict[str, Any], pd.DataFrame, Optional[pd.DataFrame]]]) -> None:
+        """一批已抓取结果在一个事务内写入 (持全局写锁); 单只失败只回滚到该标的的 SAVEPOINT。"""
+        nonlocal index_ready
+        with _write_txn(con):
+            for ts_code in rebuild_only:
+                _rebuild_delete(ts_code)
+            for job, df, df_old in batch:
+                ts_code = job["ts_code"]
+                con.execute("SAVEPOINT sync_symbol")
+                try:
+                    if rebuild:
+                        _rebuild_delete(ts_code)
+                    wrote_new = False
+                    if not df.empty:
+                        _upsert(
+                            con,
+                            df,
+                            target_table,
+                            context_ts=ts_code,
+                            context_name=job["name"],
+                            write_mode=write_mode,
+                            update_columns=update_columns,
+                            index_ready=index_ready,
+                        )
+                        # 写入后最新日期 = max(原 latest, 本次最大日期), 无需回查
+                        wrote_new = str(df["trade_date"].max()) > str(job["latest"] or "")
+                    else:
+                        logger.debug(
+                            "[%s] %s 无数据返回 start=%s", target_table, ts_code, job["start_date"]
+                        )
+                    if df_old is not None and not df_old.empty:
+                        _upsert(
+                            con,
+                            df_old,
+                            target_table,
+                            context_ts=ts_code,
+                            context_name=job["name"],
+                            write_mode=write_mode,
+                            update_columns=update_columns,
+                            index_ready=index_ready,
+                        )
+                    con.execute("RELEASE sync_symbol")
+                except Exception as exc:
+                    logger.warning(
+                        "[%s] %s 同步失败: %s", target_table, ts_code, exc, exc_info=True
+                    )
+                    con.execute("ROLLBACK TO sync_symbol")
+                    con.execute("RELEASE sync_symbol")
+                    _COLS_CACHE.pop(target_table, None)  # 回滚可能撤销了建表/ALTER
+                    continue
+                # 有写入后表与索引必然已存在 (首只建表时由 _upsert 建好)
+                index_ready = index_ready or not df.empty
+                if wrote_new or job["start_date"] < today:
+                    synced.append(ts_code)
+            # 本批标的连同 sync_date 一起落盘
+            _set_last_sync(con, target_table, synced, today)
+        # 提交成功后才丢弃待删除/待标记列表
+        rebuild_only.clear()
+        synced.clear()
+
+    # -------- 抓取: 线程池并发请求, 等待结果时不持锁; 写入: 按批取全局写锁, 提交后再等下一个结果 --------
+    processed = 0
+    batch: List[tuple[Dict[str, Any], pd.DataFrame, Optional[pd.DataFrame]]] = []
+    batch_rows = 0
+    last_commit = time.monotonic()
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        job_iter = iter(jobs)
+        pending: deque = deque()
+
+        def _fill() -> None:
+            # 有界预取: 最多 2*FETCH_WORKERS 个结果在内存中等待写入
+            while len(pending) < FETCH_WORKERS * 2:
+                job = next(job_iter, None)
+                if job is None:
+                    return
+                pending.append((job, pool.submit(_fetch_job, job)))
+
+        _fill()
+        while pending:
+            job, fut = pending.popleft()
+            _fill()
+            try:
+                df, df_old = fut.result()
+            except Exception as exc:
+                logger.warning(
+                    "[%s] %s 同步失败: %s", target_table, job["ts_code"], exc, exc_info=True
+                )
+            else:
+                batch.append((job, df, df_old))
+                batch_rows += len(df) + (0 if df_old is None else len(df_old))
+            processed += 1
+            if processed % 10 == 0 or processed == total:
+                logger.info(
+                    "[%s] 进度 %d/%d (%.1f%%)",
+                    target_table,
+                    processed,
+                    total,
+                    processed / total * 100,
+                )
+            # 按累计行数/时长分批提交
+            if batch and (
+                batch_rows >= COMMIT_ROWS or time.monotonic() - last_commit >= COMMIT_SECONDS
+            ):
+                _write_batch(batch)
+                batch, batch_rows = [], 0
+                last_commit = time.monotonic()
+    # 末批 (含无需抓取的 rebuild 删除与仅标记的代码)
+    _write_batch(batch)
 
 
 # ───────────────────────────────────────────── 顶层入口 ──
@@ -871,13 +1283,17 @@ def sync(
     rebuild: bool = False,
     backfill_history: bool = False,
 ) -> None:
-    pro = ts.pro_api(get_tushare_token())
+    pro = pro_api(get_tushare_token())
     today = datetime.now().strftime("%Y%m%d")
     ts_filter = set(ts_codes) if ts_codes else None
     if rebuild and not ts_filter:
         raise ValueError("rebuild=True requires ts_codes")
-    with _connect() as con:
-        for table_key in _iter_tables(tables):
+    table_keys = list(_iter_tables(tables))
+
+    def _sync_table(table_key: str) -> None:
+        # sqlite3 连接不跨线程: 每个表在自己的线程里用独立连接
+        con = _connect()
+        try:
             _sync_one_table(
                 pro,
                 con,
@@ -887,6 +1303,19 @@ def sync(
                 rebuild=bool(rebuild),
                 backfill_history=bool(backfill_history),
             )
+        finally:
+            con.close()
+
+    with _connect() as con:  # 先建好 sync_date, 各线程不再并发建表
+        # 各表互不依赖: 并发同步, 共享 _LIMITER 保证总调用频率不超配额
+        with ThreadPoolExecutor(max_workers=max(1, min(TABLE_WORKERS, len(table_keys)))) as pool:
+            futures = [pool.submit(_sync_table, table_key) for table_key in table_keys]
+            for fut in futures:
+                fut.result()
+        # 增量刷新 A+H 交易日历物化表 (回测 calendar feed 直接范围扫描)
+        added = refresh_trade_calendar(con, rebuild=bool(rebuild))
+        con.commit()
+        logger.info("[trade_calendar] 新增 %d 个交易日", added)
     logger.info("全部完成")
 
 
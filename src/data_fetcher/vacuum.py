@@ -1,8 +1,24 @@
+from pathlib import Path
+
 from qs.sqlite_utils import connect_sqlite
 
+SQLITE_PATH = Path("data/data.sqlite")
+# 空闲页占比低于该值时跳过 VACUUM: 日常增量几乎不产生空闲页, 重写整个库文件得不偿失
+MIN_FREE_RATIO = 0.10
+
 
-def db_vacuum():
-    con = connect_sqlite("data/data.sqlite")
-    con.execute("VACUUM")
-    con.execute("ANALYZE")
-    con.close()
+def db_vacuum(
+    db_path: str | Path = SQLITE_PATH, *, min_free_ratio: float = MIN_FREE_RATIO
+) -> bool:
+    """按需 VACUUM (空闲页占比达到 min_free_ratio 才重写) 后 ANALYZE; 返回是否执行了 VACUUM。"""
+    con = connect_sqlite(db_path)
+    try:
+        (pages,) = con.execute("PRAGMA page_count").fetchone()
+        (free,) = con.execute("PRAGMA freelist_count").fetchone()
+        vacuumed = bool(pages) and free / pages >= min_free_ratio
+        if vacuumed:
+            con.execute("VACUUM")
+        con.execute("ANALYZE")
+    finally:
+        con.close()
+    return vacuumed
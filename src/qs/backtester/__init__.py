@@ -1,4 +1,4 @@
-from .data import Bar, DataFeed
+from .data import Bar, DataFeed, bars_from_rows
 from .broker import Broker, Position, TradeRecord
 from .engine import BacktestEngine, EquityPoint, Strategy
 from .market import PriceRequest, SqliteMarketData, StrategyContext
@@ -12,6 +12,7 @@ from .stats import (
 __all__ = [
     "Bar",
     "DataFeed",
+    "bars_from_rows",
     "Broker",
     "Position",
     "TradeRecord",
@@ -1,9 +1,10 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Optional
+from itertools import starmap
+from typing import Iterable, List, Optional, Sequence, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class Bar:
     trade_date: str
     open: float
@@ -13,13 +14,62 @@ class Bar:
     pct_chg: Optional[float]
 
 
+def bars_from_rows(rows: Iterable[Sequence]) -> List[Bar]:
+    """Build bars from positional rows (trade_date, open, high, low, close, pct_chg).
+
+    Accepts DB cursor rows or `df.itertuples(index=False, name=None)` directly;
+    `starmap` avoids a Python-level loop body per row.
+    """
+    return list(starmap(Bar, rows))
+
+
 class DataFeed:
     def __init__(self, bars: List[Bar]):
-        self._bars = bars
+        self._bars: Optional[List[Bar]] = bars
+        self._cols: Optional[Tuple[Sequence, ...]] = None
+        self._n = len(bars)
         self._i = 0
+        self._cur: Optional[Bar] = None
+        self._prev: Optional[Bar] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        trade_dates: Sequence,
+        open: Sequence,
+        high: Sequence,
+        low: Sequence,
+        close: Sequence,
+        pct_chg: Optional[Sequence] = None,
+    ) -> "DataFeed":
+        """Build a feed over column arrays (lists or numpy arrays) without a Bar list.
+
+        Bars are materialized lazily, one per step, so memory stays columnar and a
+        long calendar does not allocate all of its Bar objects up front. Each Bar
+        is a fresh object, so strategies may keep references to past bars.
+        """
+        n = len(trade_dates)
+        if any(len(c) != n for c in (open, high, low, close)) or (
+            pct_chg is not None and len(pct_chg) != n
+        ):
+            raise ValueError("DataFeed.from_arrays: column lengths differ")
+        feed = cls.__new__(cls)
+        feed._bars = None
+        feed._cols = (trade_dates, open, high, low, close, pct_chg)
+        feed._n = n
+        feed._i = 0
+        feed._cur = None
+        feed._prev = None
+        return feed
+
+    def _bar_at(self, i: int) -> Bar:
+        if self._bars is not None:
+            return self._bars[i]
+        d, o, h, l, c, pct = self._cols  # type: ignore[misc]
+        return Bar(d[i], o[i], h[i], l[i], c[i], None if pct is None else pct[i])
 
     def __len__(self):
-        return len(self._bars)
+        return self._n
 
     @property
     def idx(self) -> int:
@@ -27,19 +77,31 @@ class DataFeed:
 
     @property
     def current(self) -> Bar:
-        return self._bars[self._i]
+        if self._bars is not None:
+            return self._bars[self._i]
+        if self._cur is None:
+            self._cur = self._bar_at(self._i)
+        return self._cur
 
     @property
     def prev(self) -> Optional[Bar]:
         if self._i == 0:
             return None
-        return self._bars[self._i - 1]
+        if self._bars is not None:
+            return self._bars[self._i - 1]
+        if self._prev is None:
+            self._prev = self._bar_at(self._i - 1)
+        return self._prev
 
     def step(self) -> bool:
-        if self._i + 1 >= len(self._bars):
+        if self._i + 1 >= self._n:
             return False
         self._i += 1
+        # columnar mode: the old current becomes prev, no re-materialization
+        self._prev, self._cur = self._cur, None
         return True
 
     def reset(self):
         self._i = 0
+        self._cur = None
+        self._prev = None
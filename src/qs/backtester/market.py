@@ -48,14 +48,14 @@ class SqliteMarketData:
         if not fields:
             raise ValueError("fields must not be empty")
         cols = ", ".join([f'd."{f}"' for f in fields])
-        in_list = ",".join([repr(s) for s in syms])
+        in_list = ",".join(["?"] * len(syms))
         if exact:
             sql = f"""
             SELECT d.ts_code, {cols}
             FROM "{table}" d
             WHERE d.trade_date=? AND d.ts_code IN ({in_list})
             """
-            rows = self._con.execute(sql, [trade_date]).fetchall()
+            rows = self._con.execute(sql, [trade_date, *syms]).fetchall()
         else:
             sql = f"""
             WITH last AS (
@@ -69,7 +69,7 @@ class SqliteMarketData:
             JOIN "{table}" d
               ON d.ts_code=l.ts_code AND d.trade_date=l.trade_date
             """
-            rows = self._con.execute(sql, [trade_date]).fetchall()
+            rows = self._con.execute(sql, [*syms, trade_date]).fetchall()
 
         out: Dict[str, Dict[str, Any]] = {}
         for row in rows:
@@ -98,12 +98,16 @@ class SqliteMarketData:
         if not fields:
             raise ValueError("fields must not be empty")
         symbol_sql = ""
+        inner_symbol_sql = ""
         params: list[Any] = [trade_date]
         if symbols is not None:
             syms = [str(s).strip() for s in symbols if str(s).strip()]
             if not syms:
                 return []
-            symbol_sql = f' AND d.ts_code IN ({",".join([repr(s) for s in syms])})'
+            in_list = ",".join(["?"] * len(syms))
+            symbol_sql = f" AND d.ts_code IN ({in_list})"
+            inner_symbol_sql = f" AND ts_code IN ({in_list})"
+            params.extend(syms)
         cols = ", ".join([f'd."{f}"' for f in fields])
         if exact:
             sql = f"""
@@ -113,10 +117,6 @@ class SqliteMarketData:
             ORDER BY d.ts_code
             """
         else:
-            inner_symbol_sql = ""
-            if symbols is not None:
-                syms = [str(s).strip() for s in symbols if str(s).strip()]
-                inner_symbol_sql = f' AND ts_code IN ({",".join([repr(s) for s in syms])})'
             sql = f"""
             WITH last AS (
               SELECT ts_code, MAX(trade_date) AS trade_date
@@ -152,7 +152,7 @@ class SqliteMarketData:
         syms = [str(s).strip() for s in symbols if str(s).strip()]
         if not syms:
             return {}
-        in_list = ",".join([repr(s) for s in syms])
+        in_list = ",".join(["?"] * len(syms))
         if request.adjusted and not request.adjustment_table:
             raise ValueError("adjustment_table is required when adjusted=True")
 
@@ -172,7 +172,7 @@ class SqliteMarketData:
             {joins}
             WHERE d.trade_date=? AND d.ts_code IN ({in_list})
             """
-            rows = self._con.execute(sql, [trade_date]).fetchall()
+            rows = self._con.execute(sql, [trade_date, *syms]).fetchall()
         else:
             sql = f"""
             WITH last AS (
@@ -187,7 +187,7 @@ class SqliteMarketData:
               ON d.ts_code=l.ts_code AND d.trade_date=l.trade_date
             {joins}
             """
-            rows = self._con.execute(sql, [trade_date]).fetchall()
+            rows = self._con.execute(sql, [*syms, trade_date]).fetchall()
 
         out: Dict[str, float] = {}
         for row in rows:
@@ -237,13 +237,14 @@ class SqliteMarketData:
             raise ValueError("fields must not be empty")
         cols = ", ".join([f'"{f}"' for f in fields])
         sql = f'SELECT ts_code, {cols} FROM "{table}"'
+        params: list[Any] = []
         if symbols is not None:
             syms = [str(s).strip() for s in symbols if str(s).strip()]
             if not syms:
                 return {}
-            in_list = ",".join([repr(s) for s in syms])
-            sql += f" WHERE ts_code IN ({in_list})"
-        rows = self._con.execute(sql).fetchall()
+            sql += f' WHERE ts_code IN ({",".join(["?"] * len(syms))})'
+            params.extend(syms)
+        rows = self._con.execute(sql, params).fetchall()
         out: Dict[str, Dict[str, Any]] = {}
         for row in rows:
             ts_code = str(row[0])
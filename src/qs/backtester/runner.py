@@ -6,10 +6,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Mapping, Optional, Sequence
 
-from qs.sqlite_utils import connect_sqlite
+from qs.sqlite_utils import (
+    TRADE_CALENDAR_TABLE,
+    connect_sqlite,
+    table_exists,
+    trade_calendar_union_sql,
+)
 
 from .broker import Broker
-from .data import Bar, DataFeed
+from .data import Bar, DataFeed, bars_from_rows
 from .defaults import DEFAULT_INITIAL_CASH
 from .engine import BacktestEngine, Strategy
 from .market import SqliteMarketData
@@ -53,7 +58,7 @@ def load_bars_from_sqlite(
         rows = con.execute(sql, params).fetchall()
     finally:
         con.close()
-    return [Bar(*r) for r in rows]
+    return bars_from_rows(rows)
 
 
 def load_calendar_bars_from_sqlite(
@@ -68,6 +73,8 @@ def load_calendar_bars_from_sqlite(
 
     Returns "calendar bars" where OHLC are placeholders aggregated from the
     underlying tables. Strategies can treat trade_date as the primary signal.
+    Reads the materialized `trade_calendar` table when present (see
+    `refresh_trade_calendar`), otherwise aggregates the daily tables.
     """
     where = ["trade_date >= ?"]
     params: list[Any] = [start_date]
@@ -75,28 +82,24 @@ def load_calendar_bars_from_sqlite(
         where.append("trade_date <= ?")
         params.append(end_date)
 
-    sql = f"""
-    SELECT trade_date,
-           MIN(open)  AS open,
-           MIN(high)  AS high,
-           MIN(low)   AS low,
-           MIN(close) AS close,
-           NULL       AS pct_chg
-    FROM (
-      SELECT trade_date, open, high, low, close FROM "{a_table}"
-      UNION ALL
-      SELECT trade_date, open, high, low, close FROM "{h_table}"
-    )
-    WHERE {" AND ".join(where)}
-    GROUP BY 1
-    ORDER BY 1
-    """
     con = connect_sqlite(db_path, read_only=True)
     try:
+        if (a_table, h_table) == ("daily_a", "daily_h") and table_exists(
+            con, TRADE_CALENDAR_TABLE
+        ):
+            sql = f"""
+            SELECT trade_date, open, high, low, close, NULL AS pct_chg
+            FROM "{TRADE_CALENDAR_TABLE}"
+            WHERE {" AND ".join(where)}
+            ORDER BY trade_date
+            """
+        else:
+            sql = trade_calendar_union_sql(a_table, h_table, " AND ".join(where))
+            params = params * 2  # where is bound once per table
         rows = con.execute(sql, params).fetchall()
     finally:
         con.close()
-    return [Bar(*r) for r in rows]
+    return bars_from_rows(rows)
 
 
 def load_calendar_bars_for_symbols_from_sqlite(
@@ -117,8 +120,8 @@ def load_calendar_bars_for_symbols_from_sqlite(
     if not syms:
         raise ValueError("symbols must not be empty")
 
-    where = ["trade_date >= ?", f"ts_code IN ({','.join([repr(s) for s in syms])})"]
-    params: list[Any] = [start_date]
+    where = ["trade_date >= ?", f"ts_code IN ({','.join(['?'] * len(syms))})"]
+    params: list[Any] = [start_date, *syms]
     if end_date:
         where.append("trade_date <= ?")
         params.append(end_date)
@@ -141,7 +144,7 @@ def load_calendar_bars_for_symbols_from_sqlite(
         rows = con.execute(sql, params).fetchall()
     finally:
         con.close()
-    return [Bar(*r) for r in rows]
+    return bars_from_rows(rows)
 
 
 def run_backtest(
@@ -0,0 +1,123 @@
+"""Vectorized (frictionless) equity curves for fast signal research.
+
+The event-driven `BacktestEngine` models fills, fees, lots and write-offs bar by
+bar. When only the shape of a signal's equity curve matters, the same target
+weights can be evaluated with a handful of numpy operations per rebalance:
+shares are fixed at each rebalance row and marked to market in one matrix
+product per holding segment.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from qs.sqlite_utils import connect_sqlite
+
+
+def run_signals(prices: np.ndarray, weights: np.ndarray, cash: float) -> np.ndarray:
+    """Equity curve for target-weight signals, rebalanced without costs.
+
+    prices:  (T, N) mark/execution prices; NaN means no price (not tradable).
+    weights: (T, N) target weights. A row with any non-NaN entry is a rebalance
+             at that row's prices (NaN entries in it count as 0); all-NaN rows
+             keep the current shares. Targets without a price stay in cash.
+    Returns a length-T float array of portfolio equity.
+    """
+    prices = np.asarray(prices, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if prices.shape != weights.shape or prices.ndim != 2:
+        raise ValueError("prices and weights must be 2-D arrays of the same shape")
+    n_rows, n_cols = prices.shape
+    equity = np.full(n_rows, float(cash))
+    if n_rows == 0:
+        return equity
+
+    marks = np.nan_to_num(prices, nan=0.0)
+    rebalance_rows = np.flatnonzero(~np.isnan(weights).all(axis=1))
+    shares = np.zeros(n_cols)
+    free_cash = float(cash)
+    bounds = list(rebalance_rows) + [n_rows]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        row_px = prices[start]
+        value = free_cash + float(marks[start] @ shares)
+        w = np.nan_to_num(weights[start], nan=0.0)
+        tradable = ~np.isnan(row_px) & (row_px > 0)
+        shares = np.zeros(n_cols)
+        shares[tradable] = value * w[tradable] / row_px[tradable]
+        free_cash = value - float(marks[start] @ shares)
+        equity[start:end] = free_cash + marks[start:end] @ shares
+    return equity
+
+
+def _ffill(mat: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column; cells before a column's first value stay NaN."""
+    valid = ~np.isnan(mat)
+    last = np.where(valid, np.arange(mat.shape[0])[:, None], 0)
+    np.maximum.accumulate(last, axis=0, out=last)
+    filled = mat[last, np.arange(mat.shape[1])]
+    filled[~np.maximum.accumulate(valid, axis=0)] = np.nan
+    return filled
+
+
+def load_close_matrix(
+    db_path: str | Path,
+    *,
+    table: str,
+    symbols: Sequence[str],
+    trade_dates: Sequence[str],
+    adjustment_table: str | None = None,
+) -> np.ndarray:
+    """(len(trade_dates), len(symbols)) close matrix, forward-filled per symbol.
+
+    One query for the whole panel. With adjustment_table the closes are
+    multiplied by adj_factor (the constant base rescaling used by
+    `SqliteMarketData` cancels out of returns). A date without a factor row
+    keeps the symbol's previous factor; dates before its first factor use that
+    first factor, and a symbol with no factor rows in range is left unadjusted.
+    Dates before a symbol's first row are NaN.
+    """
+    syms = list(symbols)
+    dates = list(trade_dates)
+    closes = np.full((len(dates), len(syms)), np.nan)
+    if not syms or not dates:
+        return closes
+    factors = np.full_like(closes, np.nan)
+    col_of = {s: j for j, s in enumerate(syms)}
+    row_of = {d: i for i, d in enumerate(dates)}
+
+    adj = "af.adj_factor" if adjustment_table else "NULL"
+    join = (
+        f'LEFT JOIN "{adjustment_table}" af ON af.ts_code=d.ts_code AND af.trade_date=d.trade_date'
+        if adjustment_table
+        else ""
+    )
+    sql = f"""
+    SELECT d.trade_date, d.ts_code, d.close, {adj}
+    FROM "{table}" d
+    {join}
+    WHERE d.ts_code IN ({",".join(["?"] * len(syms))}) AND d.trade_date BETWEEN ? AND ?
+    """
+    con = connect_sqlite(db_path, read_only=True)
+    try:
+        cur = con.execute(sql, [*syms, min(dates), max(dates)])
+        for trade_date, ts_code, close, adj_factor in cur:
+            i = row_of.get(trade_date)
+            if i is None or close is None or close <= 0:
+                continue
+            closes[i, col_of[ts_code]] = close
+            if adj_factor is not None:
+                factors[i, col_of[ts_code]] = adj_factor
+    finally:
+        con.close()
+
+    if adjustment_table:
+        # forward-fill, then back-fill the leading gap from the first known factor
+        factors = _ffill(_ffill(factors)[::-1])[::-1]
+        closes = closes * np.nan_to_num(factors, nan=1.0)
+    return _ffill(closes)
+
+
+__all__ = ["load_close_matrix", "run_signals"]
@@ -1,18 +1,41 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta
 from pathlib import Path
+from itertools import chain
 from typing import TYPE_CHECKING, Any, Sequence
+import atexit
 import sqlite3
 
 if TYPE_CHECKING:  # pragma: no cover
     import pandas as pd
 
+_DUCKDB_UNAVAILABLE = False
+_SHARED_RO_CONNECTIONS: dict[str, sqlite3.Connection] = {}
 
-def connect_sqlite(db_path: str | Path, *, read_only: bool = False) -> sqlite3.Connection:
+
+_MMAP_SIZE = 1 << 30  # 1 GiB for readers; SQLite clamps to its compile-time maximum
+_CACHE_SIZE_KIB = 262144  # 256 MiB page cache for shared readers (pages are allocated lazily)
+# Sync jobs open one writer per table/thread: keep each writer's footprint small.
+_WRITER_MMAP_SIZE = 1 << 28  # 256 MiB
+_WRITER_CACHE_SIZE_KIB = 32768  # 32 MiB
+_ROWS_PER_INSERT = 500  # rows per multi-row INSERT ... VALUES (...), (...) statement
+
+
+def connect_sqlite(
+    db_path: str | Path,
+    *,
+    read_only: bool = False,
+    cache_size_kib: int | None = None,
+    mmap_size: int | None = None,
+) -> sqlite3.Connection:
     """Open a SQLite connection.
 
-    - read_only=True uses SQLite URI mode=ro (fails if DB file is missing).
-    - Applies a few pragmatic PRAGMA defaults.
+    - read_only=True uses SQLite URI mode=ro (fails if DB file is missing) and
+      sets query_only + mmap so scans read mapped pages instead of pread calls.
+    - Writers get WAL (switched once; the mode persists in the file),
+      synchronous=NORMAL and a modest page cache and mmap window.
+    - cache_size_kib / mmap_size override the defaults for either mode.
     """
     path = Path(db_path)
     if read_only:
@@ -22,12 +45,46 @@ def connect_sqlite(db_path: str | Path, *, read_only: bool = False) -> sqlite3.C
         path.parent.mkdir(parents=True, exist_ok=True)
         con = sqlite3.connect(path.as_posix())
     con.execute("PRAGMA foreign_keys=ON")
-    if not read_only:
-        con.execute("PRAGMA journal_mode=WAL")
+    if mmap_size is None:
+        mmap_size = _MMAP_SIZE if read_only else _WRITER_MMAP_SIZE
+    con.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+    if read_only:
+        con.execute("PRAGMA query_only=1")
+    else:
+        (mode,) = con.execute("PRAGMA journal_mode").fetchone()
+        if str(mode).lower() != "wal":
+            con.execute("PRAGMA journal_mode=WAL")
         con.execute("PRAGMA synchronous=NORMAL")
+        if cache_size_kib is None:
+            cache_size_kib = _WRITER_CACHE_SIZE_KIB
+    if cache_size_kib is not None:
+        con.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+    return con
+
+
+def get_shared_ro_connection(db_path: str | Path) -> sqlite3.Connection:
+    """Return a process-wide read-only connection for db_path, opened once.
+
+    Intended for scripts that run several queries against the same file: the
+    open + PRAGMA cost is paid once and the page cache stays warm. Callers must
+    not close it; all shared connections are closed at interpreter exit.
+    """
+    key = str(Path(db_path).resolve())
+    con = _SHARED_RO_CONNECTIONS.get(key)
+    if con is None:
+        con = connect_sqlite(key, read_only=True, cache_size_kib=_CACHE_SIZE_KIB)
+        con.execute("PRAGMA temp_store=MEMORY")
+        _SHARED_RO_CONNECTIONS[key] = con
     return con
 
 
+@atexit.register
+def close_shared_connections() -> None:
+    while _SHARED_RO_CONNECTIONS:
+        _, con = _SHARED_RO_CONNECTIONS.popitem()
+        con.close()
+
+
 def table_exists(con: sqlite3.Connection, table: str) -> bool:
     row = con.execute(
         "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", [table]
@@ -99,6 +156,72 @@ def read_sql_df(
     return pd.read_sql_query(sql, con, params=list(params) if params else None)
 
 
+def read_sql_df_columnar(
+    db_path: str | Path, sql: str, params: Sequence[Any] | None = None
+) -> "pd.DataFrame":
+    """Read a bulk query from a SQLite file, preferring DuckDB's columnar scanner.
+
+    DuckDB (optional dependency) attaches the file read-only and materializes
+    the result column-wise, avoiding per-row Python object boxing of sqlite3.
+    Queries use unqualified table names and `?` placeholders in both paths.
+    Falls back to pandas over the shared read-only sqlite3 connection when
+    duckdb or its sqlite extension is unavailable (remembered, so later calls
+    skip the attempt) or when DuckDB rejects this particular query (that call
+    only).
+    """
+    global _DUCKDB_UNAVAILABLE
+    path = Path(db_path)
+    if not _DUCKDB_UNAVAILABLE:
+        try:
+            import duckdb  # type: ignore
+        except ImportError:
+            _DUCKDB_UNAVAILABLE = True
+        else:
+            duck = duckdb.connect()
+            try:
+                quoted = path.as_posix().replace("'", "''")
+                try:
+                    duck.execute(f"ATTACH '{quoted}' AS src (TYPE SQLITE, READ_ONLY)")
+                    duck.execute("USE src")
+                except duckdb.Error:
+                    # Extension missing/offline: use sqlite3 from now on.
+                    _DUCKDB_UNAVAILABLE = True
+                else:
+                    try:
+                        return duck.execute(sql, list(params) if params else []).fetchdf()
+                    except duckdb.Error:
+                        pass  # dialect/type gap in this query: sqlite3 for this call only
+            finally:
+                duck.close()
+
+    return read_sql_df(get_shared_ro_connection(path), sql, params)
+
+
+def df_to_records(df: "pd.DataFrame") -> list[tuple]:
+    """Row tuples of plain Python values for executemany, with NaN/NA -> None.
+
+    Built column-wise (`Series.tolist()` converts in C) and zipped once, which
+    avoids the structured-array round trip of `to_records().tolist()`; only
+    columns that actually contain nulls get a Python-level None pass.
+    """
+    cols: list[list[Any]] = []
+    for name in df.columns:
+        series = df[name]
+        values = series.tolist()
+        null_mask = series.isna().to_numpy()
+        if null_mask.any():
+            values = [None if is_null else v for v, is_null in zip(values, null_mask.tolist())]
+        cols.append(values)
+    return list(zip(*cols))
+
+
+def _max_variables(con: sqlite3.Connection) -> int:
+    getlimit = getattr(con, "getlimit", None)  # Python 3.11+
+    if getlimit is None:
+        return 999  # SQLITE_MAX_VARIABLE_NUMBER default before SQLite 3.32
+    return int(getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER))
+
+
 def insert_df_ignore(
     con: sqlite3.Connection,
     *,
@@ -108,38 +231,142 @@ def insert_df_ignore(
 ) -> int:
     """Insert rows from df into table, ignoring duplicates (SQLite INSERT OR IGNORE).
 
-    Returns inserted row count estimate (changes in total row count).
+    Rows are sent as multi-row VALUES statements (up to _ROWS_PER_INSERT rows,
+    within the bound-variable limit), which runs noticeably faster than one
+    executemany step per row. The caller owns the transaction.
+    Returns the number of rows actually inserted.
     """
     if df.empty:
         return 0
 
-    import pandas as pd
-
-    work = df.copy()
+    work = df
     if unique_by and all(c in work.columns for c in unique_by):
-        work = work.drop_duplicates(subset=list(unique_by))
+        # API pages rarely repeat keys: only pay for a filtered copy when they do.
+        dup = work.duplicated(subset=list(unique_by))
+        if dup.any():
+            work = work[~dup.to_numpy()]
 
     if not table_exists(con, table):
         work.head(0).to_sql(table, con, if_exists="fail", index=False)
 
     cols = list(work.columns)
     quoted_cols = ", ".join([f'"{c}"' for c in cols])
-    placeholders = ", ".join(["?"] * len(cols))
-    sql = f'INSERT OR IGNORE INTO "{table}" ({quoted_cols}) VALUES ({placeholders})'
+    row_sql = "(" + ", ".join(["?"] * len(cols)) + ")"
+    prefix = f'INSERT OR IGNORE INTO "{table}" ({quoted_cols}) VALUES '
+    per_stmt = max(1, min(_ROWS_PER_INSERT, _max_variables(con) // len(cols)))
+    full_sql = prefix + ", ".join([row_sql] * per_stmt)
 
-    before = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
-    records = work.where(pd.notnull(work), None).to_records(index=False).tolist()
-    con.executemany(sql, records)
-    after = con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
-    return int(after - before)
+    # Ignored duplicates are not counted as changes, so the total_changes delta
+    # is the inserted row count without two full-table COUNT(*) scans.
+    records = df_to_records(work)
+    before = con.total_changes
+    for start in range(0, len(records), per_stmt):
+        chunk = records[start : start + per_stmt]
+        sql = full_sql if len(chunk) == per_stmt else prefix + ", ".join([row_sql] * len(chunk))
+        con.execute(sql, list(chain.from_iterable(chunk)))
+    return int(con.total_changes - before)
+
+
+TRADE_CALENDAR_TABLE = "trade_calendar"
+# Re-scan this many days before the calendar's last date on every refresh, so
+# dates that reach the daily tables late (lookback/backfill) are still picked up.
+TRADE_CALENDAR_REFRESH_DAYS = 30
+
+
+def trade_calendar_union_sql(a_table: str, h_table: str, where: str) -> str:
+    """Per-date placeholder bars aggregated over the A and H daily tables.
+
+    `where` is applied inside each arm (so a trade_date index can be used);
+    bind its parameters twice, once per table.
+    """
+    return f"""
+    SELECT trade_date,
+           MIN(open)  AS open,
+           MIN(high)  AS high,
+           MIN(low)   AS low,
+           MIN(close) AS close,
+           NULL       AS pct_chg
+    FROM (
+      SELECT trade_date, open, high, low, close FROM "{a_table}" WHERE {where}
+      UNION ALL
+      SELECT trade_date, open, high, low, close FROM "{h_table}" WHERE {where}
+    )
+    GROUP BY 1
+    ORDER BY 1
+    """
+
+
+def refresh_trade_calendar(
+    con: sqlite3.Connection,
+    *,
+    a_table: str = "daily_a",
+    h_table: str = "daily_h",
+    rebuild: bool = False,
+) -> int:
+    """Materialize the A+H calendar into `trade_calendar` (incremental by default).
+
+    Only the last TRADE_CALENDAR_REFRESH_DAYS before the current max are
+    re-scanned (through a trade_date index on each source table), so the daily
+    sync can call this cheaply and late-arriving dates are still added. Use
+    rebuild=True after deleting rows from the source tables. Returns the
+    number of inserted dates; the caller commits.
+    """
+    if not (table_exists(con, a_table) and table_exists(con, h_table)):
+        return 0
+    con.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS "{TRADE_CALENDAR_TABLE}" (
+            trade_date VARCHAR,
+            open       REAL,
+            high       REAL,
+            low        REAL,
+            close      REAL
+        )
+        """
+    )
+    ensure_unique_index(
+        con,
+        table=TRADE_CALENDAR_TABLE,
+        columns=["trade_date"],
+        index_name=f"{TRADE_CALENDAR_TABLE}_uq",
+    )
+    for table in (a_table, h_table):
+        con.execute(f'CREATE INDEX IF NOT EXISTS "{table}_trade_date" ON "{table}"(trade_date)')
+    if rebuild:
+        con.execute(f'DELETE FROM "{TRADE_CALENDAR_TABLE}"')
+    row = con.execute(f'SELECT MAX(trade_date) FROM "{TRADE_CALENDAR_TABLE}"').fetchone()
+    last = str(row[0]) if row and row[0] is not None else ""
+    try:
+        since = (
+            datetime.strptime(last, "%Y%m%d") - timedelta(days=TRADE_CALENDAR_REFRESH_DAYS)
+        ).strftime("%Y%m%d")
+    except ValueError:  # empty calendar (or unexpected format): full scan
+        since = ""
+    cur = con.execute(
+        f"""
+        INSERT OR IGNORE INTO "{TRADE_CALENDAR_TABLE}" (trade_date, open, high, low, close)
+        SELECT trade_date, open, high, low, close
+        FROM ({trade_calendar_union_sql(a_table, h_table, "trade_date >= ?")})
+        """,
+        [since, since],
+    )
+    return int(cur.rowcount or 0)
 
 
 __all__ = [
     "connect_sqlite",
+    "get_shared_ro_connection",
+    "close_shared_connections",
     "table_exists",
     "ensure_unique_index",
     "dedupe_table",
     "ensure_unique_index_with_dedupe",
     "read_sql_df",
+    "read_sql_df_columnar",
+    "df_to_records",
     "insert_df_ignore",
+    "TRADE_CALENDAR_TABLE",
+    "TRADE_CALENDAR_REFRESH_DAYS",
+    "trade_calendar_union_sql",
+    "refresh_trade_calendar",
 ]
@@ -159,37 +159,63 @@ class AHPremiumQuarterlyStrategy:
         p = (m - 1) // self.rebalance_month_interval
         return f"{y}P{p}"
 
-    def _is_rebalance_day(self, trade_date: str, signal_date: str | None) -> bool:
+    def is_rebalance_day(self, trade_date: str, signal_date: str | None) -> bool:
         if signal_date is None or trade_date < self.start_date:
             return False
         pk = self._period_key(trade_date)
         return pk != self._last_rebalance_period
 
-    def _load_premium_for_date(self, ctx: StrategyContext, trade_date: str) -> List[PremiumRecord]:
+    def mark_rebalanced(self, trade_date: str) -> None:
+        self._last_rebalance_period = self._period_key(trade_date)
+
+    def rank_premiums(
+        self, history: Any, signal_date: str
+    ) -> tuple[List[PremiumRecord], List[PremiumRecord]]:
+        """(bottom_k, top_k) premium records as of signal_date; empty when no data."""
+        recs = self._load_premium_for_date(history, signal_date)
+        if not recs:
+            return [], []
+        sorted_recs = sorted(recs, key=lambda r: r.premium_pct)
+        return sorted_recs[: self.bottom_k], sorted_recs[-self.top_k :]
+
+    def target_weights(
+        self, bottom: Sequence[PremiumRecord], top: Sequence[PremiumRecord]
+    ) -> Dict[str, float]:
+        """A leg on the lowest premiums, H leg on the highest, split by capital_split."""
+        if not bottom or not top:
+            return {}
+        w_each_a = (1 - self.capital_split) / len(bottom)
+        w_each_h = self.capital_split / len(top)
+        return {
+            **{r.cn_code: w_each_a for r in bottom},
+            **{r.hk_code: w_each_h for r in top},
+        }
+
+    def _load_premium_for_date(self, history: Any, trade_date: str) -> List[PremiumRecord]:
         t0 = time.perf_counter()
         a_codes = [cn for _, cn, _ in self._pairs]
         h_codes = [hk for _, _, hk in self._pairs]
-        a_raw = ctx.history.get_price_map(
+        a_raw = history.get_price_map(
             request=self._a_raw_close_request,
             symbols=a_codes,
             trade_date=trade_date,
         )
-        h_raw = ctx.history.get_price_map(
+        h_raw = history.get_price_map(
             request=self._h_raw_close_request,
             symbols=h_codes,
             trade_date=trade_date,
         )
-        a_adj = ctx.history.get_price_map(
+        a_adj = history.get_price_map(
             request=self._a_adj_close_request,
             symbols=a_codes,
             trade_date=trade_date,
         )
-        h_adj = ctx.history.get_price_map(
+        h_adj = history.get_price_map(
             request=self._h_adj_close_request,
             symbols=h_codes,
             trade_date=trade_date,
         )
-        hk_to_cny = ctx.history.get_hk_to_cny_rate(trade_date)
+        hk_to_cny = history.get_hk_to_cny_rate(trade_date)
         if hk_to_cny is None:
             return []
 
@@ -293,29 +319,16 @@ class AHPremiumQuarterlyStrategy:
         if base_marks:
             ctx.set_mark_request(prices=base_marks)
 
-        if not self._is_rebalance_day(ctx.trade_date, ctx.signal_date):
+        if not self.is_rebalance_day(ctx.trade_date, ctx.signal_date):
             return
         signal_date = ctx.signal_date
         if signal_date is None:
             return
 
-        premium_recs = self._load_premium_for_date(ctx, signal_date)
-        if not premium_recs:
+        bottom, top = self.rank_premiums(ctx.history, signal_date)
+        targets = self.target_weights(bottom, top)
+        if not targets:
             return
-        sorted_recs = sorted(premium_recs, key=lambda r: r.premium_pct)
-        bottom = sorted_recs[: self.bottom_k]
-        top = sorted_recs[-self.top_k :]
-        a_symbols = [r.cn_code for r in bottom]
-        h_symbols = [r.hk_code for r in top]
-        if not a_symbols or not h_symbols:
-            return
-
-        w_each_a = (1 - self.capital_split) / len(a_symbols)
-        w_each_h = self.capital_split / len(h_symbols)
-        targets = {
-            **{s: w_each_a for s in a_symbols},
-            **{s: w_each_h for s in h_symbols},
-        }
         trade_symbols = sorted(set(targets.keys()) | set(current_symbols))
         price_map = self._current_open_prices(ctx, trade_symbols)
         if len(price_map) != len(trade_symbols):
@@ -336,7 +349,7 @@ class AHPremiumQuarterlyStrategy:
                     "cn_code": rec.cn_code,
                     "hk_code": rec.hk_code,
                     "premium_pct": rec.premium_pct,
-                    "target_weight": w_each_a,
+                    "target_weight": targets[rec.cn_code],
                     "a_close_raw": rec.a_close_raw,
                     "h_close_raw_cny": rec.h_close_raw_cny,
                     "a_close_adj": rec.a_close_adj,
@@ -352,7 +365,7 @@ class AHPremiumQuarterlyStrategy:
                     "cn_code": rec.cn_code,
                     "hk_code": rec.hk_code,
                     "premium_pct": rec.premium_pct,
-                    "target_weight": w_each_h,
+                    "target_weight": targets[rec.hk_code],
                     "a_close_raw": rec.a_close_raw,
                     "h_close_raw_cny": rec.h_close_raw_cny,
                     "a_close_adj": rec.a_close_adj,
@@ -366,11 +379,11 @@ class AHPremiumQuarterlyStrategy:
                 "decisions": decisions,
             }
         )
-        self._last_rebalance_period = self._period_key(ctx.trade_date)
+        self.mark_rebalanced(ctx.trade_date)
         t1 = time.perf_counter()
         print(
             f"[AHPremiumQuarterlyStrategy] rebalance {ctx.trade_date} premium_date={signal_date} "
-            f"A_count={len(a_symbols)} H_count={len(h_symbols)} in {t1-t0:.3f}s"
+            f"A_count={len(bottom)} H_count={len(top)} in {t1-t0:.3f}s"
         )
 
 
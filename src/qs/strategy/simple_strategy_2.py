@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, Sequence
 
 from qs.backtester.market import PriceRequest, StrategyContext
 
@@ -11,11 +11,32 @@ class PairContext:
     """Deprecated compatibility shim for older scripts.
 
     Historical and current prices are now provided by `StrategyContext`.
+    H-share columns are stored column-wise: `row_of` maps trade_date to the
+    row index shared by `h_open` / `h_pct` / `h_close`.
     """
 
-    h_open: Dict[str, float]
-    h_pct: Dict[str, float]
-    h_close: Dict[str, float]
+    row_of: Dict[str, int]
+    h_open: Sequence[float]
+    h_pct: Sequence[float]
+    h_close: Sequence[float]
+
+    @classmethod
+    def from_frame(cls, df: Any) -> "PairContext":
+        """Build from a DataFrame with trade_date/open/pct_chg/close columns."""
+        dates = df["trade_date"].astype(str).tolist()
+        return cls(
+            row_of={d: i for i, d in enumerate(dates)},
+            h_open=df["open"].to_numpy(),
+            h_pct=df["pct_chg"].to_numpy(),
+            h_close=df["close"].to_numpy(),
+        )
+
+    def h_prices(self, trade_date: str) -> tuple[float, float, float] | None:
+        """Return (open, pct_chg, close) for trade_date, or None if absent."""
+        i = self.row_of.get(trade_date)
+        if i is None:
+            return None
+        return float(self.h_open[i]), float(self.h_pct[i]), float(self.h_close[i])
 
 
 class SimpleStrategy2:
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parents[1] / "scripts"
+if str(SCRIPTS) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS))
+
+import ah_premium_quarterly_bt as bt  # noqa: E402
+from qs.backtester.broker import Broker  # noqa: E402
+from qs.backtester.engine import BacktestEngine  # noqa: E402
+from qs.backtester.market import SqliteMarketData  # noqa: E402
+from qs.strategy.ah_premium_quarterly import AHPremiumQuarterlyStrategy  # noqa: E402
+
+# Spans a quarter boundary: rebalances on 20240326 (first signal) and 20240401
+DAYS = ["20240325", "20240326", "20240327", "20240328", "20240329", "20240401", "20240402", "20240403"]
+PAIRS = [("p1", "600001.SH", "00001.HK"), ("p2", "600002.SH", "00002.HK"), ("p3", "600003.SH", "00003.HK")]
+# A/H closes per day; the cheapest pair (A leg) changes between the two signal dates
+A_CLOSE = {
+    "600001.SH": [10.0, 10.5, 11.0, 10.8, 16.0, 16.5, 16.2, 16.8],
+    "600002.SH": [20.0, 19.0, 19.5, 20.5, 17.0, 17.5, 17.2, 17.9],
+    "600003.SH": [30.0, 31.0, 29.0, 30.5, 31.5, 15.5, 16.0, 16.4],  # 2:1 split on 20240401
+}
+H_CLOSE = {
+    "00001.HK": [12.0, 12.2, 12.6, 12.4, 13.0, 13.4, 13.1, 13.8],
+    "00002.HK": [18.0, 18.5, 18.2, 18.9, 17.0, 17.5, 17.9, 18.3],
+    "00003.HK": [25.0, 24.0, 25.5, 26.0, 12.6, 12.9, 13.3, 13.0],  # 2:1 split on 20240329
+}
+USDCNH = [7.20, 7.21, 7.22, 7.19, 7.25, 7.24, 7.23, 7.26]
+USDHKD = [7.80, 7.81, 7.80, 7.82, 7.79, 7.80, 7.81, 7.80]
+
+
+def _adj(code: str, day: str) -> float:
+    split = {"600003.SH": "20240401", "00003.HK": "20240329"}.get(code)
+    return 2.0 if split and day >= split else 1.0
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the strategy resolves data/ah_codes.csv relative to cwd first
+    (tmp_path / "data").mkdir()
+    with open(tmp_path / "data" / "ah_codes.csv", "w", encoding="utf-8") as f:
+        f.write("name,cn_code,hk_code\n")
+        f.writelines(f"{name},{cn},{hk}\n" for name, cn, hk in PAIRS)
+
+    path = tmp_path / "data" / "data.sqlite"
+    con = sqlite3.connect(path)
+    try:
+        for mkt, closes in (("a", A_CLOSE), ("h", H_CLOSE)):
+            con.execute(
+                f"CREATE TABLE daily_{mkt} (ts_code TEXT, trade_date TEXT, open REAL, high REAL, low REAL, close REAL)"
+            )
+            con.execute(f"CREATE TABLE adj_factor_{mkt} (ts_code TEXT, trade_date TEXT, adj_factor REAL)")
+            con.execute(f"CREATE TABLE stock_basic_{mkt} (ts_code TEXT, delist_date TEXT)")
+            for code, px in closes.items():
+                # open == close so the engine's open fills match the fast path's close entries
+                con.executemany(
+                    f"INSERT INTO daily_{mkt} VALUES (?,?,?,?,?,?)",
+                    [(code, d, p, p, p, p) for d, p in zip(DAYS, px)],
+                )
+                con.executemany(
+                    f"INSERT INTO adj_factor_{mkt} VALUES (?,?,?)", [(code, d, _adj(code, d)) for d in DAYS]
+                )
+                con.execute(f"INSERT INTO stock_basic_{mkt} VALUES (?, NULL)", (code,))
+        con.execute("CREATE TABLE fx_daily (ts_code TEXT, trade_date TEXT, bid_close REAL, ask_close REAL)")
+        for code, mids in (("USDCNH.FXCM", USDCNH), ("USDHKD.FXCM", USDHKD)):
+            con.executemany(
+                "INSERT INTO fx_daily VALUES (?,?,?,?)",
+                [(code, d, m - 0.001, m + 0.001) for d, m in zip(DAYS, mids)],
+            )
+        con.commit()
+    finally:
+        con.close()
+    return str(path)
+
+
+def _run_engine(db_path: str, args: Namespace):
+    strat = AHPremiumQuarterlyStrategy(
+        db_path_raw=db_path,
+        top_k=args.top,
+        bottom_k=args.bottom,
+        start_date=args.start,
+        capital_split=args.capital_split,
+    )
+    broker = Broker(cash=args.cash, commission_rate=0.0, tax_rate=0.0, slippage=0.0, min_commission=0.0)
+    market_data = SqliteMarketData(db_path)
+    try:
+        engine = BacktestEngine(bt.load_calendar(args.start, db_path), broker, strat, market_data=market_data)
+        return engine.run(), strat.rebalance_history
+    finally:
+        market_data.close()
+
+
+def test_run_fast_matches_event_engine_without_frictions(db):
+    # large cash keeps the engine's whole-share rounding well below the tolerance
+    args = Namespace(start="20240101", top=1, bottom=1, cash=1e9, capital_split=0.4)
+
+    fast = bt.run_fast(args, db)
+    slow, history = _run_engine(db, args)
+
+    held = [sorted(d["symbol"] for d in r["decisions"]) for r in history]
+    assert [r["rebalance_date"] for r in history] == ["20240326", "20240401"]
+    assert held[0] != held[1]
+    assert [p.trade_date for p in fast] == DAYS
+    assert [p.trade_date for p in slow] == DAYS
+    for f, s in zip(fast, slow):
+        assert f.equity == pytest.approx(s.equity, rel=1e-6), f.trade_date
+    assert fast[-1].equity != pytest.approx(args.cash, rel=1e-3)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from qs.backtester.broker import Broker
-from qs.backtester.data import Bar, DataFeed
+from qs.backtester.data import Bar, DataFeed, bars_from_rows
 from qs.backtester.engine import BacktestEngine
 
 
@@ -24,3 +24,24 @@ def test_engine_curve_len_matches_bars():
     assert len(curve) == len(bars)
     assert [p.trade_date for p in curve] == [b.trade_date for b in bars]
 
+
+def test_bars_from_rows_builds_positional_bars():
+    rows = [("20200102", 1.0, 2.0, 0.5, 1.5, 0.1), ("20200103", 1.5, 1.6, 1.4, 1.5, None)]
+
+    bars = bars_from_rows(rows)
+
+    assert bars == [Bar(*rows[0]), Bar(*rows[1])]
+
+
+def test_feed_from_arrays_matches_bar_list_feed():
+    rows = [("20200102", 1.0, 2.0, 0.5, 1.5, 0.1), ("20200103", 1.5, 1.6, 1.4, 1.5, None)]
+    cols = list(zip(*rows))
+    feed = DataFeed.from_arrays(*cols)
+    broker = Broker(1_000_000.0, symbol="TEST.SYM")
+
+    curve = BacktestEngine(feed, broker, _NoOpStrategy()).run()
+
+    assert len(feed) == 2
+    assert [p.trade_date for p in curve] == ["20200102", "20200103"]
+    assert feed.current == Bar(*rows[1])
+    assert feed.prev == Bar(*rows[0])
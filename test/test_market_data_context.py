@@ -14,7 +14,7 @@ from qs.strategy.etf_equal_weight_annual import ETFEqualWeightAnnualStrategy
 from qs.strategy.etf_min_premium_weekly import ETFMinPremiumWeeklyStrategy
 from qs.strategy.ignored_stock_strategy import IgnoredStockStrategy
 from qs.strategy.low_pe_quarterly import LowPEQuarterlyStrategy
-from qs.strategy.simple_strategy_2 import SimpleStrategy2
+from qs.strategy.simple_strategy_2 import PairContext, SimpleStrategy2
 
 
 def _init_etf_db(db_path):
@@ -138,6 +138,22 @@ def test_market_data_supports_snapshot_rows_and_full_reference_reads(tmp_path):
         )
         assert ref["600001.SH"]["name"] == "Demo A"
         assert ref["600002.SH"]["list_date"] == "20110101"
+
+        picked = history.get_snapshot_rows(
+            table="bak_daily_a",
+            fields=["pe"],
+            trade_date="20200103",
+            exact=False,
+            symbols=["600002.SH"],
+        )
+        assert [(row["ts_code"], row["trade_date"], row["pe"]) for row in picked] == [
+            ("600002.SH", "20200102", 9.0)
+        ]
+        assert market_data.reference().get_values(
+            table="stock_basic_a",
+            symbols=["600001.SH"],
+            fields=["name"],
+        ) == {"600001.SH": {"name": "Demo A"}}
     finally:
         market_data.close()
 
@@ -355,6 +371,23 @@ def test_simple_strategy_2_uses_framework_market_data(tmp_path):
     assert held == {"601628.SH"}
 
 
+def test_pair_context_from_frame_indexes_h_columns_by_date():
+    import pandas as pd
+
+    h_df = pd.DataFrame(
+        {
+            "trade_date": ["20200102", "20200103"],
+            "open": [8.0, 8.5],
+            "close": [8.2, 8.4],
+            "pct_chg": [2.0, -1.0],
+        }
+    )
+    ctx = PairContext.from_frame(h_df)
+
+    assert ctx.h_prices("20200103") == (8.5, -1.0, 8.4)
+    assert ctx.h_prices("20200104") is None
+
+
 def test_low_pe_strategy_uses_framework_market_data(tmp_path):
     db = tmp_path / "t.sqlite"
     con = sqlite3.connect(db)
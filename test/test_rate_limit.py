@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import time
+
+from data_fetcher.rate_limit import RateLimiter
+
+
+def test_rate_limiter_allows_burst_then_throttles():
+    limiter = RateLimiter(20, 1.0, capacity=2)
+
+    start = time.monotonic()
+    limiter.acquire()
+    limiter.acquire()
+    burst = time.monotonic() - start
+    limiter.acquire()
+    throttled = time.monotonic() - start
+
+    assert burst < 0.04
+    assert throttled >= 0.04
+
+
+def test_rate_limiter_backoff_delays_next_acquire():
+    limiter = RateLimiter(1000, 1.0, capacity=5)
+
+    limiter.backoff(0.05)
+    start = time.monotonic()
+    limiter.acquire()
+
+    assert time.monotonic() - start >= 0.04
@@ -3,6 +3,7 @@ from __future__ import annotations
 import sqlite3
 
 from qs.backtester.runner import load_calendar_bars_from_sqlite
+from qs.sqlite_utils import refresh_trade_calendar
 
 
 def test_load_calendar_bars_from_sqlite_union_sorted(tmp_path):
@@ -32,3 +33,52 @@ def test_load_calendar_bars_from_sqlite_union_sorted(tmp_path):
     bars = load_calendar_bars_from_sqlite(db_path=db, start_date="20200101")
     assert [b.trade_date for b in bars] == ["20200102", "20200103"]
 
+
+def test_refresh_trade_calendar_is_incremental_and_used_by_loader(tmp_path):
+    db = tmp_path / "t.sqlite"
+    con = sqlite3.connect(db)
+    try:
+        con.execute(
+            "CREATE TABLE daily_a (ts_code TEXT, trade_date TEXT, open REAL, high REAL, low REAL, close REAL)"
+        )
+        con.execute(
+            "CREATE TABLE daily_h (ts_code TEXT, trade_date TEXT, open REAL, high REAL, low REAL, close REAL)"
+        )
+        con.execute('INSERT INTO daily_a VALUES ("000001.SZ","20200102",1,1,1,1)')
+        con.execute('INSERT INTO daily_h VALUES ("00005.HK","20200102",2,2,2,2)')
+        assert refresh_trade_calendar(con) == 1
+
+        con.execute('INSERT INTO daily_h VALUES ("00005.HK","20200103",2,2,2,2)')
+        assert refresh_trade_calendar(con) == 1
+        assert refresh_trade_calendar(con) == 0
+        con.commit()
+    finally:
+        con.close()
+
+    bars = load_calendar_bars_from_sqlite(db_path=db, start_date="20200103")
+    assert [(b.trade_date, b.close) for b in bars] == [("20200103", 2.0)]
+
+
+def test_refresh_trade_calendar_picks_up_late_dates_in_window(tmp_path):
+    db = tmp_path / "t.sqlite"
+    con = sqlite3.connect(db)
+    try:
+        con.execute(
+            "CREATE TABLE daily_a (ts_code TEXT, trade_date TEXT, open REAL, high REAL, low REAL, close REAL)"
+        )
+        con.execute(
+            "CREATE TABLE daily_h (ts_code TEXT, trade_date TEXT, open REAL, high REAL, low REAL, close REAL)"
+        )
+        con.execute('INSERT INTO daily_a VALUES ("000001.SZ","20200102",1,1,1,1)')
+        con.execute('INSERT INTO daily_a VALUES ("000001.SZ","20200110",1,1,1,1)')
+        assert refresh_trade_calendar(con) == 2
+
+        # an H-only date arriving after the calendar already reached 20200110
+        con.execute('INSERT INTO daily_h VALUES ("00005.HK","20200106",2,2,2,2)')
+        assert refresh_trade_calendar(con) == 1
+        con.commit()
+    finally:
+        con.close()
+
+    bars = load_calendar_bars_from_sqlite(db_path=db, start_date="20200101")
+    assert [b.trade_date for b in bars] == ["20200102", "20200106", "20200110"]
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+import types
+
+import pytest
+
+import qs.sqlite_utils as su
+from qs.sqlite_utils import (
+    close_shared_connections,
+    connect_sqlite,
+    df_to_records,
+    get_shared_ro_connection,
+    insert_df_ignore,
+    read_sql_df_columnar,
+)
+
+
+def test_read_sql_df_columnar_binds_params(tmp_path):
+    db = tmp_path / "t.sqlite"
+    con = sqlite3.connect(db)
+    try:
+        con.execute("CREATE TABLE daily_a (ts_code TEXT, trade_date TEXT, close REAL)")
+        con.execute('INSERT INTO daily_a VALUES ("000001.SZ", "20200102", 1.5)')
+        con.execute('INSERT INTO daily_a VALUES ("000001.SZ", "20200103", 1.6)')
+        con.execute('INSERT INTO daily_a VALUES ("000002.SZ", "20200103", 9.9)')
+        con.commit()
+    finally:
+        con.close()
+
+    df = read_sql_df_columnar(
+        db,
+        "SELECT trade_date, close FROM daily_a WHERE ts_code=? ORDER BY trade_date",
+        ["000001.SZ"],
+    )
+
+    assert list(df["trade_date"]) == ["20200102", "20200103"]
+    assert list(df["close"]) == [1.5, 1.6]
+
+
+class _FakeDuckError(Exception):
+    pass
+
+
+def _fake_duckdb(*, attach_ok: bool, queries: list):
+    """Minimal stand-in for the duckdb module: records queries, rejects GLOB."""
+    import pandas as pd
+
+    class _Con:
+        def execute(self, sql, params=None):
+            if sql.startswith("ATTACH"):
+                if not attach_ok:
+                    raise _FakeDuckError("sqlite_scanner unavailable")
+                return self
+            if sql.startswith("USE"):
+                return self
+            queries.append(sql)
+            if "GLOB" in sql:
+                raise _FakeDuckError("no such function")
+            return types.SimpleNamespace(fetchdf=lambda: pd.DataFrame({"via": ["duckdb"]}))
+
+        def close(self):
+            pass
+
+    return types.SimpleNamespace(connect=_Con, Error=_FakeDuckError)
+
+
+def test_read_sql_df_columnar_query_error_falls_back_for_that_call_only(tmp_path, monkeypatch):
+    db = tmp_path / "t.sqlite"
+    con = sqlite3.connect(db)
+    con.execute("CREATE TABLE t (x TEXT)")
+    con.execute("INSERT INTO t VALUES ('a')")
+    con.commit()
+    con.close()
+    queries: list = []
+    monkeypatch.setitem(sys.modules, "duckdb", _fake_duckdb(attach_ok=True, queries=queries))
+    monkeypatch.setattr(su, "_DUCKDB_UNAVAILABLE", False)
+    try:
+        df = read_sql_df_columnar(db, "SELECT x FROM t WHERE x GLOB 'a'")
+        assert list(df["x"]) == ["a"]  # served by sqlite3
+        assert su._DUCKDB_UNAVAILABLE is False
+
+        df = read_sql_df_columnar(db, "SELECT x FROM t")
+        assert list(df["via"]) == ["duckdb"]
+        assert len(queries) == 2
+    finally:
+        close_shared_connections()
+
+
+def test_read_sql_df_columnar_attach_failure_disables_duckdb(tmp_path, monkeypatch):
+    db = tmp_path / "t.sqlite"
+    sqlite3.connect(db).close()
+    queries: list = []
+    monkeypatch.setitem(sys.modules, "duckdb", _fake_duckdb(attach_ok=False, queries=queries))
+    monkeypatch.setattr(su, "_DUCKDB_UNAVAILABLE", False)
+    try:
+        read_sql_df_columnar(db, "SELECT 1 AS one")
+        assert su._DUCKDB_UNAVAILABLE is True
+        assert queries == []
+    finally:
+        close_shared_connections()
+
+
+def test_shared_ro_connection_is_reused_and_read_only(tmp_path):
+    db = tmp_path / "t.sqlite"
+    sqlite3.connect(db).close()
+
+    con = get_shared_ro_connection(db)
+    try:
+        assert get_shared_ro_connection(tmp_path / "." / "t.sqlite") is con
+        with pytest.raises(sqlite3.OperationalError):
+            con.execute("CREATE TABLE t (x INTEGER)")
+    finally:
+        close_shared_connections()
+    assert get_shared_ro_connection(db) is not con
+    close_shared_connections()
+
+
+def test_connect_sqlite_pragmas_by_mode(tmp_path):
+    db = tmp_path / "t.sqlite"
+    writer = connect_sqlite(db)
+    try:
+        assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert writer.execute("PRAGMA query_only").fetchone()[0] == 0
+    finally:
+        writer.close()
+
+    reader = connect_sqlite(db, read_only=True)
+    try:
+        assert reader.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert reader.execute("PRAGMA mmap_size").fetchone()[0] > 0
+    finally:
+        reader.close()
+
+
+def test_connect_sqlite_writer_cache_is_small_and_configurable(tmp_path):
+    db = tmp_path / "t.sqlite"
+    writer = connect_sqlite(db)
+    try:
+        assert -writer.execute("PRAGMA cache_size").fetchone()[0] <= 32768
+    finally:
+        writer.close()
+
+    writer = connect_sqlite(db, cache_size_kib=4096, mmap_size=0)
+    try:
+        assert writer.execute("PRAGMA cache_size").fetchone()[0] == -4096
+        assert writer.execute("PRAGMA mmap_size").fetchone()[0] == 0
+    finally:
+        writer.close()
+
+
+def test_df_to_records_maps_nulls_to_none_and_python_types():
+    import pandas as pd
+
+    df = pd.DataFrame({"a": ["x", None], "b": [1.5, float("nan")], "c": [1, 2]})
+
+    rows = df_to_records(df)
+
+    assert rows == [("x", 1.5, 1), (None, None, 2)]
+    assert type(rows[0][2]) is int
+
+
+def test_insert_df_ignore_counts_only_new_rows(tmp_path):
+    import pandas as pd
+
+    con = connect_sqlite(tmp_path / "t.sqlite")
+    try:
+        con.execute("CREATE TABLE t (ts_code TEXT PRIMARY KEY, v REAL)")
+        con.execute("INSERT INTO t VALUES ('a', 1.0)")
+        df = pd.DataFrame({"ts_code": ["a", "b", "b", "c"], "v": [9.0, 2.0, 2.0, 3.0]})
+
+        inserted = insert_df_ignore(con, df=df, table="t", unique_by=["ts_code"])
+
+        assert inserted == 2
+        assert con.execute("SELECT v FROM t WHERE ts_code='a'").fetchone()[0] == 1.0
+    finally:
+        con.close()
+
+
+def test_insert_df_ignore_dedupes_frame_without_unique_index(tmp_path):
+    import pandas as pd
+
+    con = connect_sqlite(tmp_path / "t.sqlite")
+    try:
+        con.execute("CREATE TABLE t (ts_code TEXT, v REAL)")
+        df = pd.DataFrame({"ts_code": ["a", "b", "a"], "v": [1.0, 2.0, 3.0]})
+
+        inserted = insert_df_ignore(con, df=df, table="t", unique_by=["ts_code"])
+
+        assert inserted == 2
+        assert con.execute("SELECT ts_code, v FROM t ORDER BY ts_code").fetchall() == [
+            ("a", 1.0),
+            ("b", 2.0),
+        ]
+    finally:
+        con.close()
+
+
+def test_insert_df_ignore_spans_multiple_statements(tmp_path):
+    import pandas as pd
+
+    con = connect_sqlite(tmp_path / "t.sqlite")
+    try:
+        con.execute("CREATE TABLE t (ts_code TEXT, trade_date TEXT, v REAL)")
+        con.execute('CREATE UNIQUE INDEX t_uq ON t ("ts_code", "trade_date")')
+        con.execute("INSERT INTO t VALUES ('a', '00010', -1.0)")
+        df = pd.DataFrame(
+            {
+                "ts_code": ["a"] * 1234,
+                "trade_date": [f"{i:05d}" for i in range(1234)],
+                "v": [float(i) for i in range(1233)] + [None],
+            }
+        )
+
+        inserted = insert_df_ignore(con, df=df, table="t", unique_by=["ts_code", "trade_date"])
+
+        assert inserted == 1233
+        assert con.execute("SELECT COUNT(*), COUNT(v) FROM t").fetchone() == (1234, 1233)
+        assert con.execute("SELECT v FROM t WHERE trade_date='00010'").fetchone()[0] == -1.0
+    finally:
+        con.close()
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import data_fetcher.tushare_sync_daily as sd
+from data_fetcher.rate_limit import RateLimiter
+
+DAYS = ["20240102", "20240103", "20240104", "20240105", "20240108"]
+TODAY = DAYS[-1]
+
+
+class _StubPro:
+    """Fake TuShare client: one row per (code, day); `fail(params)` makes a call raise."""
+
+    def __init__(self, codes, fail=None):
+        self.codes = list(codes)
+        self.fail = fail or (lambda params: False)
+        self.calls: list[dict] = []
+
+    def trade_cal(self, **params):
+        return pd.DataFrame({"cal_date": DAYS})
+
+    def __getattr__(self, api_name):
+        if api_name.startswith("__"):
+            raise AttributeError(api_name)
+
+        def query(*, fields, offset=0, limit=None, **params):
+            self.calls.append(params)
+            if self.fail(params):
+                raise RuntimeError("stub failure")
+            lo = params.get("trade_date") or params.get("start_date")
+            hi = params.get("trade_date") or params.get("end_date")
+            codes = [params["ts_code"]] if "ts_code" in params else self.codes
+            cols = fields.split(",")
+            rows = [
+                [c if f == "ts_code" else d if f == "trade_date" else float(i) for f in cols]
+                for i, d in enumerate(DAYS)
+                if lo <= d <= hi
+                for c in codes
+            ]
+            return pd.DataFrame(rows[offset : offset + limit], columns=cols)
+
+        return query
+
+
+@pytest.fixture
+def con(tmp_path, monkeypatch):
+    monkeypatch.setattr(sd, "SQLITE_PATH", tmp_path / "data.sqlite")
+    monkeypatch.setattr(sd, "START_DATE", "20240101")
+    monkeypatch.setattr(sd, "_LIMITER", RateLimiter(1e9, 1.0))
+    monkeypatch.setattr(sd, "_retry_delay", lambda base, attempt: 0.0)
+    monkeypatch.setattr(sd, "_SSE_OPEN_DAYS", None)
+    monkeypatch.setattr(sd, "_SSE_CAL_FAILED", False)
+    con = sd._connect()
+    yield con
+    con.close()
+
+
+def _basic(con, codes):
+    pd.DataFrame({"ts_code": codes, "name": codes, "list_date": "20240102"}).to_sql(
+        "stock_basic_a", con, index=False
+    )
+    con.commit()
+
+
+def _seed_daily(con, codes, days, value=-1.0):
+    fields = sd.TABLE_CONFIG["daily_a"]["fields"]
+    rows = [[c, d] + [value] * (len(fields) - 2) for c in codes for d in days]
+    pd.DataFrame(rows, columns=fields).to_sql("daily_a", con, index=False)
+    con.commit()
+
+
+def _rows(con, sql, *params):
+    return con.execute(sql, params).fetchall()
+
+
+def test_fetch_by_trade_date_returns_none_when_one_day_fails(con):
+    pro = _StubPro(["A"], fail=lambda p: p.get("trade_date") == "20240103")
+
+    df = sd._fetch_by_trade_date(
+        pro, "daily", ["ts_code", "trade_date"], DAYS[:3], limit=100, sleep=0, sleep_on_fail=0
+    )
+
+    assert df is None
+
+
+def test_failed_pivot_day_falls_back_to_per_symbol_fetch(con):
+    codes = ["A", "B", "C", "D", "E", "F"]
+    _basic(con, codes)
+    _seed_daily(con, codes, DAYS[:1])
+    pro = _StubPro(codes, fail=lambda p: "ts_code" not in p and p.get("trade_date") == "20240103")
+
+    sd._sync_one_table(pro, con, "daily_a", TODAY)
+
+    assert {p["ts_code"] for p in pro.calls if "ts_code" in p} == set(codes)
+    # every code marked as synced really has the day the pivot fetch lost
+    marked = {r[0] for r in _rows(con, "SELECT ts_code FROM sync_date WHERE last_update_date=?", TODAY)}
+    assert marked == set(codes)
+    filled = _rows(con, "SELECT COUNT(*) FROM daily_a WHERE trade_date='20240103'")
+    assert filled == [(len(codes),)]
+
+
+def test_trade_days_skip_weekends_only_for_exchange_apis(con):
+    pro = _StubPro([])
+
+    # 20240106/07 is a weekend; FX quotes are requested for every calendar day
+    assert sd._trade_days(pro, "fx_daily", "20240105", "20240108") == [
+        "20240105",
+        "20240106",
+        "20240107",
+        "20240108",
+    ]
+    assert sd._trade_days(pro, "hk_daily", "20240105", "20240108") == ["20240105", "20240108"]
+    assert sd._trade_days(pro, "daily", "20240102", "20240104") == DAYS[:3]
+
+
+def test_http_pool_covers_peak_fetch_concurrency():
+    from data_fetcher.tushare_client import POOL_MAXSIZE
+
+    assert sd.TABLE_WORKERS * sd.FETCH_WORKERS <= POOL_MAXSIZE
+
+
+def test_per_symbol_path_writes_rows_and_marks_sync_date(con):
+    _basic(con, ["A", "B"])
+    pro = _StubPro(["A", "B"])
+
+    sd._sync_one_table(pro, con, "daily_a", TODAY)
+
+    assert all("ts_code" in p for p in pro.calls if "start_date" in p or "trade_date" in p)
+    assert _rows(con, "SELECT ts_code, COUNT(*) FROM daily_a GROUP BY 1") == [("A", 5), ("B", 5)]
+    assert _rows(con, "SELECT ts_code, last_update_date FROM sync_date ORDER BY 1") == [
+        ("A", TODAY),
+        ("B", TODAY),
+    ]
+
+
+def test_pivot_path_fetches_market_wide_days(con):
+    codes = ["A", "B", "C", "D", "E", "F"]
+    _basic(con, codes)
+    pro = _StubPro(codes + ["Z"])  # Z is not in the universe and must not be stored
+
+    sd._sync_one_table(pro, con, "daily_a", TODAY)
+
+    assert sorted(p["trade_date"] for p in pro.calls) == DAYS
+    assert _rows(con, "SELECT COUNT(*), COUNT(DISTINCT ts_code) FROM daily_a") == [(30, 6)]
+    assert _rows(con, "SELECT COUNT(*) FROM sync_date WHERE last_update_date=?", TODAY) == [(6,)]
+
+
+def test_rebuild_replaces_only_the_selected_codes(con):
+    _basic(con, ["A", "B"])
+    _seed_daily(con, ["A", "B"], DAYS[:2], value=-1.0)
+
+    sd._sync_one_table(_StubPro(["A", "B"]), con, "daily_a", TODAY, ts_codes_filter={"A"}, rebuild=True)
+
+    assert _rows(con, "SELECT COUNT(*), MIN(close) FROM daily_a WHERE ts_code='A'") == [(5, 0.0)]
+    assert _rows(con, "SELECT COUNT(*), MIN(close) FROM daily_a WHERE ts_code='B'") == [(2, -1.0)]
+    assert _rows(con, "SELECT ts_code FROM sync_date") == [("A",)]
+
+
+def test_per_symbol_writes_commit_in_row_batches(con, monkeypatch):
+    _basic(con, ["A", "B", "C"])
+    monkeypatch.setattr(sd, "COMMIT_ROWS", 5)
+    txns = []
+    real_txn = sd._write_txn
+
+    def counting_txn(c):
+        txns.append(c)
+        return real_txn(c)
+
+    monkeypatch.setattr(sd, "_write_txn", counting_txn)
+
+    sd._sync_one_table(_StubPro(["A", "B", "C"]), con, "daily_a", TODAY)
+
+    # one batch per symbol (5 rows each), then the final (empty) batch
+    assert len(txns) == 3 + 1
+    assert not con.in_transaction
+    assert _rows(con, "SELECT COUNT(*) FROM daily_a") == [(15,)]
+    assert _rows(con, "SELECT COUNT(*) FROM sync_date") == [(3,)]
+
+
+def test_failing_symbol_rolls_back_to_its_savepoint_only(con, monkeypatch):
+    _basic(con, ["A", "B", "C"])
+    real_upsert = sd._upsert
+
+    def flaky_upsert(c, df, table, *, context_ts=None, **kwargs):
+        written = real_upsert(c, df, table, context_ts=context_ts, **kwargs)
+        if context_ts == "B":
+            raise RuntimeError("write failed after insert")
+        return written
+
+    monkeypatch.setattr(sd, "_upsert", flaky_upsert)
+
+    sd._sync_one_table(_StubPro(["A", "B", "C"]), con, "daily_a", TODAY)
+
+    assert _rows(con, "SELECT ts_code, COUNT(*) FROM daily_a GROUP BY 1") == [("A", 5), ("C", 5)]
+    assert _rows(con, "SELECT ts_code FROM sync_date ORDER BY 1") == [("A",), ("C",)]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import sqlite3
+
+from data_fetcher.vacuum import db_vacuum
+
+
+def _make_db(path, *, delete_most: bool) -> None:
+    con = sqlite3.connect(path)
+    con.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, payload TEXT)")
+    con.executemany("INSERT INTO t (payload) VALUES (?)", [("x" * 500,) for _ in range(2000)])
+    if delete_most:
+        con.execute("DELETE FROM t WHERE id > 100")
+    con.commit()
+    con.close()
+
+
+def test_db_vacuum_skips_when_few_free_pages(tmp_path):
+    db = tmp_path / "data.sqlite"
+    _make_db(db, delete_most=False)
+
+    assert db_vacuum(db) is False
+
+
+def test_db_vacuum_rewrites_when_many_free_pages(tmp_path):
+    db = tmp_path / "data.sqlite"
+    _make_db(db, delete_most=True)
+
+    assert db_vacuum(db) is True
+    con = sqlite3.connect(db)
+    (free,) = con.execute("PRAGMA freelist_count").fetchone()
+    con.close()
+    assert free == 0
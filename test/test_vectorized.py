@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+
+from qs.backtester.vectorized import load_close_matrix, run_signals
+
+
+def test_run_signals_holds_shares_between_rebalances():
+    nan = np.nan
+    prices = np.array([[10.0, 20.0], [11.0, 20.0], [12.0, 10.0], [12.0, 10.0]])
+    weights = np.array([[nan, nan], [0.5, 0.5], [nan, nan], [0.0, 1.0]])
+
+    equity = run_signals(prices, weights, 1000.0)
+
+    # row 1: 500/11 shares of A + 25 shares of B; row 2 marks them at 12 / 10
+    assert equity[0] == 1000.0
+    assert equity[1] == 1000.0
+    assert np.isclose(equity[2], 500 / 11 * 12 + 25 * 10)
+    assert np.isclose(equity[3], equity[2])
+
+
+def test_run_signals_keeps_unpriced_targets_in_cash():
+    prices = np.array([[np.nan, 10.0], [np.nan, 20.0]])
+    weights = np.array([[0.5, 0.5], [np.nan, np.nan]])
+
+    equity = run_signals(prices, weights, 100.0)
+
+    assert np.allclose(equity, [100.0, 150.0])
+
+
+def test_load_close_matrix_adjusts_and_forward_fills(tmp_path):
+    db = tmp_path / "t.sqlite"
+    con = sqlite3.connect(db)
+    try:
+        con.execute("CREATE TABLE daily_a (ts_code TEXT, trade_date TEXT, close REAL)")
+        con.execute("CREATE TABLE adj_factor_a (ts_code TEXT, trade_date TEXT, adj_factor REAL)")
+        con.executemany(
+            "INSERT INTO daily_a VALUES (?,?,?)",
+            [
+                ("A", "20200102", 1.0),
+                ("A", "20200106", 2.0),
+                ("A", "20200107", 4.0),
+                ("B", "20200103", 5.0),
+            ],
+        )
+        con.execute('INSERT INTO adj_factor_a VALUES ("A", "20200106", 3.0)')
+        con.commit()
+    finally:
+        con.close()
+
+    mat = load_close_matrix(
+        db,
+        table="daily_a",
+        adjustment_table="adj_factor_a",
+        symbols=["A", "B"],
+        trade_dates=["20200102", "20200103", "20200106", "20200107"],
+    )
+
+    # A's only factor (3.0) also covers the dates before and after it: raw returns are kept
+    assert np.isnan(mat[0, 1])
+    assert mat[:, 0].tolist() == [3.0, 3.0, 6.0, 12.0]
+    assert mat[1:, 1].tolist() == [5.0, 5.0, 5.0]